@@ -1,8 +1,9 @@
+import asyncio
 import logging
 import csv
 from io import StringIO
 from datetime import datetime, timedelta
-from typing import Union
+from typing import Optional, Union
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, FSInputFile, BufferedInputFile
@@ -14,12 +15,18 @@ from config import settings
 from bot.states import UserStates
 from database.models import User, InterviewSession, Recommendation
 from database.repositories import UserRepository, InterviewSessionRepository, RecommendationRepository
+from services.ai_service import ai_service
+from services.getcourse import getcourse_service
+from services.user_cache import user_cache
+from services.reverification import reverify_all, format_report
 
 logger = logging.getLogger(__name__)
 router = Router()
 
 ADMIN_PREFIX = "admin_"
 
+_reverify_task: Optional[asyncio.Task] = None
+
 def is_admin(telegram_id: int) -> bool:
     return telegram_id in settings.admin_ids_list
 
@@ -55,6 +62,30 @@ Quyidagi tugmalardan birini tanlang:"""
     await message.answer(welcome_text, reply_markup=get_admin_keyboard(), parse_mode="HTML")
 
 
+@router.message(Command("reverify"))
+async def cmd_reverify(message: Message):
+    global _reverify_task
+    if not is_admin(message.from_user.id):
+        await message.answer("⛔️ Sizda admin huquqi yo'q")
+        return
+    
+    if _reverify_task and not _reverify_task.done():
+        await message.answer("⏳ Qayta tekshiruv allaqachon ishlamoqda")
+        return
+    
+    await message.answer("🔄 GetCourse bo'yicha qayta tekshiruv boshlandi. Natija tayyor bo'lganda xabar beraman.")
+    _reverify_task = asyncio.create_task(run_reverification(message))
+
+
+async def run_reverification(message: Message):
+    try:
+        report = await reverify_all()
+        await message.answer(format_report(report), parse_mode="HTML")
+    except Exception as e:
+        logger.error(f"Error in bulk re-verification: {e}")
+        await message.answer("❌ Qayta tekshiruvda xatolik")
+
+
 @router.callback_query(F.data.startswith(ADMIN_PREFIX))
 async def admin_callback(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
     if not is_admin(callback.from_user.id):
@@ -113,7 +144,13 @@ async def show_statistics(callback: CallbackQuery, session: AsyncSession):
 • Yangi foydalanuvchilar: {stats['new_users_today']}
 • Yakunlangan intervyular: {stats['completed_today']}
 
-🕐 <b>O'rtacha tavsiya vaqti:</b> {stats['avg_generation_time']:.1f}s"""
+🕐 <b>O'rtacha tavsiya vaqti:</b> {stats['avg_generation_time']:.1f}s
+
+{format_llm_stats()}
+
+{format_getcourse_stats()}
+
+{format_cache_stats()}"""
         
         await callback.message.edit_text(stats_text, reply_markup=get_admin_keyboard(), parse_mode="HTML")
         await callback.answer()
@@ -123,6 +160,45 @@ async def show_statistics(callback: CallbackQuery, session: AsyncSession):
         await callback.answer("❌ Xatolik")
 
 
+def format_llm_stats() -> str:
+    gateway_stats = ai_service.gateway.stats()
+    lines = [
+        f"🤖 <b>LLM navbati:</b> {gateway_stats['in_flight']}/{gateway_stats['max_concurrency']} band"
+    ]
+    for lane, lane_stats in gateway_stats["lanes"].items():
+        lines.append(
+            f"• {lane}: navbatda {lane_stats['queued']}, so'rovlar {lane_stats['requests']}, "
+            f"kutish o'rtacha {lane_stats['avg_wait']:.1f}s / maks {lane_stats['max_wait']:.1f}s"
+        )
+    return "\n".join(lines)
+
+
+def format_getcourse_stats() -> str:
+    api_stats = getcourse_service.stats()
+    return (
+        f"🌐 <b>GetCourse API:</b>\n"
+        f"• So'rovlar: {api_stats['calls_made']}, rad etilgan: {api_stats['calls_throttled']}\n"
+        f"• Kutganlar: {api_stats['calls_delayed']}, jami kutish {api_stats['wait_time']:.1f}s "
+        f"(o'rtacha {api_stats['avg_wait']:.1f}s)"
+    )
+
+
+def format_cache_stats() -> str:
+    user_stats = user_cache.stats()
+    lines = [
+        "🗄 <b>Keshlar:</b>",
+        f"• Foydalanuvchilar: {user_stats['hit_rate']:.1f}% "
+        f"(lokal {user_stats['local_hits']}, Redis {user_stats['redis_hits']}, DB {user_stats['misses']})",
+    ]
+    for name, cache in (
+        ("GetCourse", getcourse_service.user_cache),
+        ("Tavsiyalar", ai_service.recommendation_cache),
+    ):
+        cache_stats = cache.stats()
+        lines.append(f"• {name}: {cache_stats['hit_rate']:.1f}% ({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']})")
+    return "\n".join(lines)
+
+
 async def show_search_prompt(callback: CallbackQuery, state: FSMContext):
     await state.set_state(UserStates.waiting_for_search)
     text = "🔍 <b>Foydalanuvchi qidirish</b>\n\nUsername yoki email yuboring (masalan: @username yoki email@example.com):"
@@ -246,6 +322,7 @@ async def show_user_history(message: Union[Message, CallbackQuery], session: Asy
 
         sessions = await InterviewSessionRepository.get_user_sessions(session, telegram_id, limit=None)
         recommendations = await RecommendationRepository.get_user_recommendations(session, telegram_id, limit=None)
+        histories = await InterviewSessionRepository.get_messages_for_sessions(session, [s.id for s in sessions])
         
         output = StringIO()
         output.write(f"Uznetix Advisor - Foydalanuvchi Dialog Tarixi\n")
@@ -269,9 +346,10 @@ async def show_user_history(message: Union[Message, CallbackQuery], session: Asy
                     output.write(f"Tugagan: {session.completed_at.strftime('%Y-%m-%d %H:%M')}\n")
                 output.write("-" * 40 + "\n")
                 
-                if session.conversation_history:
+                history = histories.get(session.id, [])
+                if history:
                     output.write("Dialog tarixi:\n")
-                    for msg in session.conversation_history[:20]: 
+                    for msg in history[:20]: 
                         role = msg.get('role', 'unknown').capitalize()
                         content = msg.get('content', '')[:150] + "..." if len(msg.get('content', '')) > 150 else msg.get('content', '')
                         timestamp = msg.get('timestamp', '')[:19] if msg.get('timestamp') else ''
@@ -408,6 +486,12 @@ async def export_stats(callback: CallbackQuery, session: AsyncSession):
         writer.writerow(["Bugungi yakunlangan", stats['completed_today']])
         writer.writerow(["O'rtacha vaqt", f"{stats['avg_generation_time']:.1f}s"])
         
+        api_stats = getcourse_service.stats()
+        writer.writerow(["GetCourse so'rovlar", api_stats['calls_made']])
+        writer.writerow(["GetCourse rad etilgan", api_stats['calls_throttled']])
+        writer.writerow(["GetCourse kutganlar", api_stats['calls_delayed']])
+        writer.writerow(["GetCourse kutish vaqti", f"{api_stats['wait_time']:.1f}s"])
+        
         csv_content = output.getvalue().encode('utf-8')
         csv_file = BufferedInputFile(csv_content, filename="uznetix_stats.csv")
         
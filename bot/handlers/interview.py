@@ -1,22 +1,33 @@
 # bot/handlers/interview.py
 import logging
 import json
-from datetime import datetime
+import time
 from aiogram import Router, F
 from aiogram.filters import StateFilter, Command
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config import settings
 from bot.keyboards.inline import get_main_menu_keyboard
 from bot.states import UserStates
+from bot.utils.streaming import StreamingMessage
 from bot.utils.text_utils import detect_script, get_text
+from database.engine import release_connection
 from database.repositories import (
     UserRepository, 
     InterviewSessionRepository, 
-    RecommendationRepository, 
 )
-from services.ai_service import ai_service
+from services.ai_service import ai_service, AIServiceUnavailable, InterviewTurn
+from services.interview_service import (
+    build_interview_context,
+    build_advisor_context,
+    get_recommendation_context,
+    remember_recommendation_context,
+    PHASE_ADVISOR,
+    PHASE_INTERVIEW,
+)
+from services.slot_extractor import extract_slots, unfilled_slots, build_local_followup, missing_fields
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -28,7 +39,7 @@ async def start_interview(callback: CallbackQuery, state: FSMContext, session: A
         await callback.answer()
         telegram_id = callback.from_user.id
         
-        user = await UserRepository.get_by_telegram_id(session, telegram_id)
+        user = await UserRepository.get_snapshot(session, telegram_id)
         if not user or not user.is_getcourse_client:
             await callback.message.answer(
                 get_text("verification_required", user.preferred_script if user else "latin")
@@ -44,6 +55,7 @@ async def start_interview(callback: CallbackQuery, state: FSMContext, session: A
                 active_session.id,
                 status="abandoned"
             )
+            ai_service.discard_prefetched_recommendation(active_session.id)
         
         interview = await InterviewSessionRepository.create(
             session,
@@ -52,12 +64,15 @@ async def start_interview(callback: CallbackQuery, state: FSMContext, session: A
             preferred_script=script,
             status="active"
         )
+        await UserRepository.increment(session, telegram_id, total_interviews=1)
         await session.commit()
         
         await state.update_data(
             interview_session_id=interview.id,
             script=script,
-            user_id=user.id
+            user_id=user.id,
+            # The greeting below asks for the goal
+            asked_field="goal"
         )
         await state.set_state(UserStates.interview_in_progress)
         
@@ -79,13 +94,6 @@ async def start_interview(callback: CallbackQuery, state: FSMContext, session: A
         )
         await session.commit()
         
-        await UserRepository.update(
-            session,
-            telegram_id,
-            total_interviews=user.total_interviews + 1
-        )
-        await session.commit()
-        
     except Exception as e:
         logger.error(f"Error starting interview: {e}")
         await callback.message.answer(
@@ -112,29 +120,86 @@ async def process_interview_message(message: Message, state: FSMContext, session
         
         user_message = message.text.strip()
         
-        await InterviewSessionRepository.add_message(
-            session,
-            interview_session_id,
-            role="user",
-            content=user_message
+        conversation_history, history_summary = build_interview_context(
+            await InterviewSessionRepository.get_messages(session, interview_session_id, phase=PHASE_INTERVIEW),
+            interview.collected_data or {}
         )
-        await session.commit()
-        
-        conversation_history = interview.conversation_history or []
         
-        bot_response, collected_data = await ai_service.conduct_interview(
-            conversation_history=conversation_history,
-            user_message=user_message,
-            script=script
+        known_fields = dict(interview.collected_data or {})
+        extracted = unfilled_slots(
+            extract_slots(user_message, settings.SLOT_EXTRACTOR_MIN_CONFIDENCE, data.get("asked_field")),
+            known_fields
         )
-
-        await message.bot.send_chat_action(message.chat.id, "typing")
         
-        await InterviewSessionRepository.add_message(
+        if extracted:
+            slot_values = {field: value for field, (value, _) in extracted.items()}
+            known_fields.update(slot_values)
+            await InterviewSessionRepository.update_collected_data(session, interview_session_id, slot_values)
+        if history_summary != interview.history_summary:
+            await InterviewSessionRepository.update_session(
+                session,
+                interview_session_id,
+                history_summary=history_summary
+            )
+        # Give the connection back to the pool for the LLM call
+        await release_connection(session)
+        
+        local_followup = None
+        if settings.INTERVIEW_LOCAL_FOLLOWUPS:
+            local_followup = build_local_followup(
+                extracted, known_fields, script, settings.SLOT_FOLLOWUP_MIN_CONFIDENCE
+            )
+        
+        if local_followup:
+            bot_response, is_complete = local_followup
+            turn = InterviewTurn(reply=bot_response, complete=is_complete)
+            await message.answer(bot_response, parse_mode="HTML")
+        elif settings.OPENAI_STREAMING:
+            await message.bot.send_chat_action(message.chat.id, "typing")
+            stream_message = StreamingMessage(message.bot, message.chat.id)
+            turn = await ai_service.stream_interview(
+                conversation_history=conversation_history,
+                user_message=user_message,
+                script=script,
+                history_summary=history_summary,
+                known_fields=known_fields,
+                on_text=stream_message.update
+            )
+            await stream_message.finish(turn.reply)
+        else:
+            await message.bot.send_chat_action(message.chat.id, "typing")
+            turn = await ai_service.conduct_interview(
+                conversation_history=conversation_history,
+                user_message=user_message,
+                script=script,
+                history_summary=history_summary,
+                known_fields=known_fields
+            )
+            await message.answer(turn.reply, parse_mode="HTML")
+        
+        bot_response = turn.reply
+        # Local follow-ups ask for the first missing field; what the LLM asked is unknown
+        asked_field = None
+        if local_followup and not turn.complete:
+            asked_field = missing_fields(known_fields)[0]
+        if asked_field != data.get("asked_field"):
+            await state.update_data(asked_field=asked_field)
+        new_fields = {
+            field: value for field, value in turn.collected.items()
+            if known_fields.get(field) != value
+        }
+        if new_fields and not turn.complete:
+            await InterviewSessionRepository.update_collected_data(session, interview_session_id, new_fields)
+        collected_data = {**known_fields, **turn.collected} if turn.complete else None
+        if not turn.complete:
+            ai_service.maybe_prefetch_recommendation(
+                interview_session_id, {**known_fields, **turn.collected}, script
+            )
+        
+        await InterviewSessionRepository.add_messages(
             session,
             interview_session_id,
-            role="assistant",
-            content=bot_response
+            [("user", user_message), ("assistant", bot_response)]
         )
         
         await InterviewSessionRepository.update_session(
@@ -144,13 +209,14 @@ async def process_interview_message(message: Message, state: FSMContext, session
         )
         await session.commit()
         
-        await message.answer(bot_response, parse_mode="HTML")
-        
         if collected_data:
             await handle_interview_completion(
                 message, state, session, interview_session_id, collected_data, script
             )
         
+    except AIServiceUnavailable:
+        logger.warning(f"AI unavailable, interview turn rejected for {message.from_user.id}")
+        await message.answer(get_text("error_ai_busy", script), parse_mode="HTML")
     except Exception as e:
         logger.error(f"Error processing interview message: {e}")
         await message.answer(
@@ -168,73 +234,118 @@ async def handle_interview_completion(
     script: str
 ):
     try:
+        # Further messages are rejected while the recommendation is generated
         await InterviewSessionRepository.update_session(
             session,
             interview_session_id,
-            status="completed",
-            completed_at=datetime.now(),
+            status="generating",
             collected_data=collected_data
         )
-        await session.commit()
+        await release_connection(session)
         
         generating_msg = await message.answer(
             get_text("generating_recommendation", script),
             parse_mode="HTML"
         )
         
-        recommendation_text = await ai_service.generate_recommendation(
-            collected_data=collected_data,
-            script=script
+        started = time.monotonic()
+        # Cached and generated bodies are shared between similar profiles; the header is this user's own
+        header = ai_service.format_profile_header(collected_data, script)
+        recommendation_body = await ai_service.take_prefetched_recommendation(
+            interview_session_id, collected_data, script
         )
+        prefetched = recommendation_body is not None
+        if not prefetched:
+            recommendation_body = await ai_service.get_cached_recommendation(collected_data, script)
+        from_cache = recommendation_body is not None and not prefetched
+        reused = prefetched or from_cache
+        
+        if reused:
+            await StreamingMessage(
+                message.bot,
+                message.chat.id,
+                message=generating_msg,
+                reply_markup=get_main_menu_keyboard(script)
+            ).finish(f"{header}\n\n{recommendation_body}")
+        elif settings.OPENAI_STREAMING:
+            stream_message = StreamingMessage(
+                message.bot,
+                message.chat.id,
+                message=generating_msg,
+                reply_markup=get_main_menu_keyboard(script)
+            )
+            recommendation_body = await ai_service.stream_recommendation(
+                collected_data=collected_data,
+                script=script,
+                on_text=lambda text: stream_message.update(f"{header}\n\n{text}")
+            )
+            await stream_message.finish(f"{header}\n\n{recommendation_body}")
+        else:
+            recommendation_body = await ai_service.generate_recommendation(
+                collected_data=collected_data,
+                script=script
+            )
+            
+            await generating_msg.delete()
+            
+            await message.answer(
+                f"{header}\n\n{recommendation_body}",
+                parse_mode="HTML",
+                reply_markup=get_main_menu_keyboard(script)
+            )
         
-        await generating_msg.delete()
-        
-        await message.answer(recommendation_text, parse_mode="HTML", reply_markup=get_main_menu_keyboard(script))
+        generation_time = time.monotonic() - started
+        if not reused:
+            await ai_service.cache_recommendation(collected_data, script, recommendation_body)
+        recommendation_text = f"{header}\n\n{recommendation_body}"
         
-        interview = await InterviewSessionRepository.get_by_id(session, interview_session_id)
-        recommendation = await RecommendationRepository.create(
+        recommendation = await InterviewSessionRepository.complete_with_recommendation(
             session,
-            session_id=interview_session_id,
-            user_id=interview.user_id,
-            telegram_id=interview.telegram_id,
+            interview_session_id,
             recommendation_type="mixed",
             content=recommendation_text,
             content_json=collected_data,
             ai_model_used=ai_service.model,
-            generation_time=0.0
+            generation_time=generation_time,
+            from_cache=from_cache
         )
         await session.commit()
         
-        user = await UserRepository.get_by_telegram_id(session, interview.telegram_id)
-        await UserRepository.update(
-            session,
-            interview.telegram_id,
-            completed_interviews=user.completed_interviews + 1
-        )
-        await session.commit()
-        
-        continue_text = get_text("continue_chat_offer", script)
+    except Exception as e:
+        logger.error(f"Error handling interview completion: {e}")
+        ai_service.discard_prefetched_recommendation(interview_session_id)
+        try:
+            # Leave a terminal status instead of "generating", which nothing cleans up
+            await session.rollback()
+            await InterviewSessionRepository.update_session(session, interview_session_id, status="failed")
+            await session.commit()
+        except Exception as db_error:
+            logger.error(f"Error marking interview session {interview_session_id} failed: {db_error}")
+        error_key = "error_ai_busy" if isinstance(e, AIServiceUnavailable) else "error_generating_recommendation"
         await message.answer(
-            continue_text,
+            get_text(error_key, script),
+            reply_markup=get_main_menu_keyboard(script),
             parse_mode="HTML"
         )
-        
+        await state.set_state(UserStates.main_menu)
+        return
+    
+    # The recommendation is saved; nothing below may mark the session failed
+    try:
         await state.set_state(UserStates.advisor_chat)
         await state.update_data(
             last_recommendation_id=recommendation.id,
-            last_recommendation_text=recommendation_text, 
-            collected_data=collected_data,
             script=script
         )
+        await remember_recommendation_context(interview_session_id, recommendation_text, collected_data)
         
-    except Exception as e:
-        logger.error(f"Error handling interview completion: {e}")
+        continue_text = get_text("continue_chat_offer", script)
         await message.answer(
-            get_text("error_generating_recommendation", script),
-            reply_markup=get_main_menu_keyboard(script),
+            continue_text,
             parse_mode="HTML"
         )
-        await state.set_state(UserStates.main_menu)
+    except Exception as e:
+        logger.error(f"Error after saving recommendation for session {interview_session_id}: {e}")
 
 
 # Post-interview advisor chat
@@ -275,38 +386,52 @@ async def process_advisor_chat(message: Message, state: FSMContext, session: Asy
     try:
         data = await state.get_data()
         script = data.get("script", "latin")
-        collected_data = data.get("collected_data", {})
-        recommendation_text = data.get("last_recommendation_text")  # ← RECOMMENDATION MATNINI OLAMIZ
         
         user_message = message.text.strip()
+        interview_session_id = data.get("interview_session_id")
         
+        collected_data = {}
+        recommendation_text = None
+        chat_history = []
+        if interview_session_id:
+            recommendation_context = await get_recommendation_context(session, interview_session_id)
+            if recommendation_context:
+                collected_data = recommendation_context["profile"]
+                recommendation_text = recommendation_context["content"]
+            chat_history = build_advisor_context(
+                await InterviewSessionRepository.get_messages(
+                    session,
+                    interview_session_id,
+                    phase=PHASE_ADVISOR,
+                    limit=settings.ADVISOR_HISTORY_TURNS * 2
+                )
+            )
+        
+        await release_connection(session)
         await message.bot.send_chat_action(message.chat.id, "typing")
         
         bot_response = await ai_service.chat_about_investments(
             user_message=user_message,
             user_profile=collected_data,
             recommendation=recommendation_text,
-            script=script
+            script=script,
+            history=chat_history
         )
         
         await message.answer(bot_response, parse_mode="HTML")
         
-        interview_session_id = data.get("interview_session_id")
         if interview_session_id:
-            await InterviewSessionRepository.add_message(
-                session,
-                interview_session_id,
-                role="user",
-                content=user_message
-            )
-            await InterviewSessionRepository.add_message(
+            await InterviewSessionRepository.add_messages(
                 session,
                 interview_session_id,
-                role="assistant",
-                content=bot_response
+                [("user", user_message), ("assistant", bot_response)],
+                phase=PHASE_ADVISOR
             )
             await session.commit()
         
+    except AIServiceUnavailable:
+        logger.warning(f"AI unavailable, advisor chat rejected for {message.from_user.id}")
+        await message.answer(get_text("error_ai_busy", script), parse_mode="HTML")
     except Exception as e:
         logger.error(f"Error in advisor chat: {e}")
         await message.answer(
@@ -5,13 +5,12 @@ from aiogram.filters import Command, StateFilter
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
 
 from bot.keyboards.inline import get_main_menu_keyboard
 from bot.states import UserStates
 from bot.utils.text_utils import detect_script, get_text
-from database.repositories import UserRepository
-from services.getcourse import getcourse_service
+from database.repositories import UserRepository, VerificationJobRepository
+from services.verification_queue import verification_queue
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -22,7 +21,7 @@ async def cmd_start(message: Message, state: FSMContext, session: AsyncSession):
     try:
         telegram_id = message.from_user.id
         
-        user = await UserRepository.get_by_telegram_id(session, telegram_id)
+        user = await UserRepository.get_snapshot(session, telegram_id)
         
         if not user:
             user = await UserRepository.create(
@@ -34,11 +33,7 @@ async def cmd_start(message: Message, state: FSMContext, session: AsyncSession):
                 language_code=message.from_user.language_code,
                 preferred_script="latin"
             )
-            
-        else:
-            await UserRepository.update_activity(session, telegram_id)
-        
-        await session.commit()
+            await session.commit()
         
         if user.is_getcourse_client:
             script = user.preferred_script or "latin"
@@ -99,41 +94,19 @@ async def process_email(message: Message, state: FSMContext, session: AsyncSessi
             parse_mode=None
         )
 
-        is_verified = await getcourse_service.verify_user(email) 
-        
-        await checking_msg.delete()
+        job = await VerificationJobRepository.create(
+            session,
+            telegram_id=telegram_id,
+            chat_id=message.chat.id,
+            email=email,
+            script=script,
+            ack_message_id=checking_msg.message_id
+        )
+        await session.commit()
         
-        if is_verified:
-            await UserRepository.update(
-                session,
-                telegram_id,
-                is_getcourse_client=True,
-                getcourse_email=email,
-                getcourse_verified_at=datetime.now(),
-                preferred_script=script
-            )
-            await session.commit()
-            
-            success_text = get_text("verification_success_uznetix", script)
-            await message.answer(
-                success_text,
-                reply_markup=get_main_menu_keyboard(script),
-                parse_mode=None
-            )
-            
-            await state.set_state(UserStates.main_menu)
-            await state.update_data(script=script)
-            
-
-            
-        else:
-            fail_text = get_text("verification_failed", script)
-            verification_text = get_text("verification_prompt", script)
-            await message.answer(
-                f"{fail_text}\n\n{verification_text}",
-                parse_mode=None
-            )
-
+        await state.set_state(UserStates.waiting_verification)
+        await state.update_data(script=script)
+        verification_queue.enqueue(job.id)
             
     except Exception as e:
         logger.error(f"Error in process_email: {e}")
@@ -141,4 +114,14 @@ async def process_email(message: Message, state: FSMContext, session: AsyncSessi
         await message.answer(
             get_text("error_general", script),
             parse_mode=None
-        )
\ No newline at end of file
+        )
+
+
+@router.message(StateFilter(UserStates.waiting_verification))
+async def verification_pending(message: Message, state: FSMContext):
+    """Reply while the background GetCourse check is still running"""
+    data = await state.get_data()
+    await message.answer(
+        get_text("verification_in_progress", data.get("script", "latin")),
+        parse_mode=None
+    )
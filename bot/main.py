@@ -3,14 +3,20 @@ import logging
 import os
 import sys
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
 from config import settings
 from database.engine import db
 from bot.handlers import start, interview, admin
+from bot.middlewares.activity import ActivityMiddleware
 from bot.middlewares.database import DatabaseMiddleware
+from bot.storage import create_storage
+from services.cache import close_redis
+from services.http_clients import http_clients
+from services.verification_queue import verification_queue
+from services.activity import activity_tracker
+from services.user_cache import user_cache
 
 # Configure logging
 logging.basicConfig(
@@ -22,20 +28,30 @@ logger = logging.getLogger(__name__)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-async def on_startup(bot: Bot):
+async def on_startup(bot: Bot, dispatcher: Dispatcher):
     """Actions on bot startup"""
     logger.info("Initializing database...")
     db.init_engine()
     await db.create_tables()
     logger.info("Database initialized")
     
+    await http_clients.startup()
+    await verification_queue.start(bot, dispatcher.storage)
+    await activity_tracker.start()
+    await user_cache.start()
+    
     logger.info(f"Bot {settings.BOT_NAME} started!")
 
 
 async def on_shutdown(bot: Bot):
     """Actions on bot shutdown"""
     logger.info("Shutting down...")
+    await verification_queue.stop()
+    await activity_tracker.stop()
+    await user_cache.stop()
     await db.dispose()
+    await http_clients.close()
+    await close_redis()
     logger.info("Bot stopped")
 
 
@@ -48,11 +64,13 @@ async def main():
         default=DefaultBotProperties(parse_mode=ParseMode.HTML)
     )
     
-    # Initialize dispatcher with memory storage
-    storage = MemoryStorage()
+    # Redis FSM storage when REDIS_URL is set, memory otherwise
+    storage = create_storage()
     dp = Dispatcher(storage=storage)
     
     # Register middlewares
+    dp.message.middleware(ActivityMiddleware())
+    dp.callback_query.middleware(ActivityMiddleware())
     dp.message.middleware(DatabaseMiddleware())
     dp.callback_query.middleware(DatabaseMiddleware())
     
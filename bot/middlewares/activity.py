@@ -0,0 +1,19 @@
+"""Activity middleware for recording users' last activity"""
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import Message, CallbackQuery
+from services.activity import activity_tracker
+
+
+class ActivityMiddleware(BaseMiddleware):
+    
+    async def __call__(
+        self,
+        handler: Callable[[Message | CallbackQuery, Dict[str, Any]], Awaitable[Any]],
+        event: Message | CallbackQuery,
+        data: Dict[str, Any]
+    ) -> Any:
+        """Mark the user as active; written to the database in batches"""
+        if event.from_user:
+            activity_tracker.touch(event.from_user.id)
+        return await handler(event, data)
@@ -1,9 +1,12 @@
 """Database middleware for providing session to handlers"""
+import logging
 from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery
 from database.engine import db
 
+logger = logging.getLogger(__name__)
+
 
 class DatabaseMiddleware(BaseMiddleware):
     
@@ -13,7 +16,15 @@ class DatabaseMiddleware(BaseMiddleware):
         event: Message | CallbackQuery,
         data: Dict[str, Any]
     ) -> Any:
-        """Provide database session"""
-        async for session in db.get_session():
-            data["session"] = session
-            return await handler(event, data)
\ No newline at end of file
+        """Provide a database session that connects on first use"""
+        session = db.lazy_session()
+        data["session"] = session
+        try:
+            result = await handler(event, data)
+        except Exception as e:
+            if session.started:
+                logger.error(f"Database session error: {e}")
+            await session.finish(e)
+            raise
+        await session.finish()
+        return result
\ No newline at end of file
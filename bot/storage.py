@@ -0,0 +1,73 @@
+"""FSM storage selection: Redis when configured, memory otherwise"""
+import json
+import logging
+from typing import Any, Dict
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.redis import RedisStorage
+
+from config import settings
+from services.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def compact_dumps(data: Dict[str, Any]) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class SessionRedisStorage(RedisStorage):
+    """
+    RedisStorage whose state and data keys expire together.
+
+    Every write refreshes the TTL of both keys in one pipelined round trip,
+    so a conversation is dropped after SESSION_TIMEOUT of inactivity instead
+    of losing its data while the state is still set.
+    """
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state_key = self.key_builder.build(key, "state")
+        data_key = self.key_builder.build(key, "data")
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if state is None:
+                pipe.delete(state_key)
+            else:
+                pipe.set(state_key, state.state if isinstance(state, State) else state, ex=self.state_ttl)
+                if self.data_ttl:
+                    pipe.expire(data_key, self.data_ttl)
+            await pipe.execute()
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        state_key = self.key_builder.build(key, "state")
+        data_key = self.key_builder.build(key, "data")
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if not data:
+                pipe.delete(data_key)
+            else:
+                pipe.set(data_key, self.json_dumps(data), ex=self.data_ttl)
+            if self.state_ttl:
+                pipe.expire(state_key, self.state_ttl)
+            await pipe.execute()
+
+    async def update_data(self, key: StorageKey, data: Dict[str, Any]) -> Dict[str, Any]:
+        current = await self.get_data(key)
+        current.update(data)
+        await self.set_data(key, current)
+        return current.copy()
+
+
+def create_storage() -> BaseStorage:
+    redis = get_redis()
+    if redis is None:
+        logger.warning("REDIS_URL is not set, FSM state is kept in memory and lost on restart")
+        return MemoryStorage()
+
+    logger.info("Using Redis FSM storage")
+    return SessionRedisStorage(
+        redis=redis,
+        state_ttl=settings.SESSION_TIMEOUT,
+        data_ttl=settings.SESSION_TIMEOUT,
+        json_dumps=compact_dumps
+    )
@@ -0,0 +1,202 @@
+"""Progressive delivery of streamed LLM text into Telegram messages"""
+import asyncio
+import logging
+import re
+import time
+from typing import Optional, List, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message, InlineKeyboardMarkup
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TAG_RE = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9-]*)([^<>]*)>")
+SENTENCE_END_RE = re.compile(r"[.!?…:](\s|$)|\n")
+
+# Telegram rejects messages over 4096 characters
+MESSAGE_SPLIT_LENGTH = 3900
+
+# Flood-control waits honoured for a final (roll-over or finish) send before giving up
+FINAL_SEND_RETRIES = 3
+
+
+def _open_tags(text: str) -> List[Tuple[str, str]]:
+    """Return (name, full opening tag) of tags left open at the end of text"""
+    stack: List[Tuple[str, str]] = []
+    for match in TAG_RE.finditer(text):
+        closing, name = match.group(1), match.group(2).lower()
+        if not closing:
+            stack.append((name, match.group(0)))
+            continue
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] == name:
+                del stack[i:]
+                break
+    return stack
+
+
+def balance_html(text: str) -> str:
+    """
+    Make a partial Telegram HTML text safe to send.
+
+    Drops a trailing unfinished tag or entity and closes tags left open.
+    """
+    last_lt = text.rfind("<")
+    if last_lt != -1 and text.find(">", last_lt) == -1:
+        text = text[:last_lt]
+
+    last_amp = text.rfind("&")
+    if last_amp != -1 and text.find(";", last_amp) == -1 and len(text) - last_amp <= 10:
+        text = text[:last_amp]
+
+    closing = "".join(f"</{name}>" for name, _ in reversed(_open_tags(text)))
+    return text.rstrip() + closing
+
+
+def _split_point(text: str, limit: int) -> int:
+    """Find a position <= limit to cut text at, preferring paragraph and line breaks"""
+    if len(text) <= limit:
+        return len(text)
+
+    head = text[:limit]
+    for separator in ("\n\n", "\n", ". ", " "):
+        pos = head.rfind(separator)
+        if pos > limit // 2:
+            split = pos + len(separator)
+            break
+    else:
+        split = limit
+
+    last_lt = head.rfind("<", 0, split)
+    if last_lt != -1 and head.find(">", last_lt, split) == -1:
+        split = last_lt
+    return split
+
+
+class StreamingMessage:
+    """
+    Shows a growing text in Telegram, editing at a bounded rate.
+
+    Text that outgrows one message continues in a new message; tags open at
+    the cut are closed in the old message and reopened in the new one.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        chat_id: int,
+        parse_mode: Optional[str] = "HTML",
+        edit_interval: Optional[float] = None,
+        reply_markup: Optional[InlineKeyboardMarkup] = None,
+        message: Optional[Message] = None,
+        max_length: int = MESSAGE_SPLIT_LENGTH
+    ):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.parse_mode = parse_mode
+        self.edit_interval = edit_interval if edit_interval is not None else settings.STREAM_EDIT_INTERVAL
+        self.reply_markup = reply_markup
+        self.max_length = max_length
+
+        self.message = message
+        self._placeholder = message is not None
+        self._offset = 0
+        self._prefix = ""
+        self._shown_text = ""
+        self._last_edit = 0.0
+
+    async def update(self, text: str):
+        """Show partial text; a new message is only sent once a sentence is complete"""
+        await self._roll_over(text)
+        current = self._current(text)
+        if not current or current == self._shown_text:
+            return
+
+        if self.message is None or self._placeholder:
+            if not SENTENCE_END_RE.search(current):
+                return
+        elif time.monotonic() - self._last_edit < self.edit_interval:
+            return
+
+        await self._show(balance_html(current), final=False)
+
+    async def finish(self, text: str):
+        """Show the complete text"""
+        await self._roll_over(text)
+        current = self._current(text)
+        if not current:
+            return
+        await self._show(current, final=True, reply_markup=self.reply_markup)
+
+    def _current(self, text: str) -> str:
+        body = text[self._offset:].strip()
+        return self._prefix + body if body else ""
+
+    async def _roll_over(self, text: str):
+        """Close the current message and move on while the text does not fit"""
+        while True:
+            body = text[self._offset:].lstrip()
+            self._offset = len(text) - len(body)
+            # Leave room for closing tags added by balance_html
+            limit = self.max_length - len(self._prefix) - 100
+            if len(body) <= limit:
+                return
+
+            split = _split_point(body, limit)
+            piece = self._prefix + body[:split]
+            await self._show(balance_html(piece), final=True)
+
+            self._prefix = "".join(tag for _, tag in _open_tags(piece))
+            self._offset += split
+            self.message = None
+            self._shown_text = ""
+
+    async def _show(self, text: str, final: bool, reply_markup: Optional[InlineKeyboardMarkup] = None):
+        retries = 0
+        while True:
+            try:
+                await self._send_or_edit(text, self.parse_mode, reply_markup)
+                break
+            except TelegramRetryAfter as e:
+                if not final:
+                    logger.debug(f"Skipping stream edit, flood control for {e.retry_after}s")
+                    return
+                # Final pieces carry text that is not shown anywhere else, wait instead of dropping it
+                if retries >= FINAL_SEND_RETRIES:
+                    raise
+                retries += 1
+                logger.warning(f"Flood control on final streamed message, retrying in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+            except TelegramBadRequest as e:
+                if "message is not modified" in str(e):
+                    return
+                if not final:
+                    logger.debug(f"Skipping stream edit: {e}")
+                    return
+                logger.warning(f"Final streamed message rejected, sending as plain text: {e}")
+                await self._send_or_edit(text, None, reply_markup)
+                break
+
+        self._placeholder = False
+        self._shown_text = text
+        self._last_edit = time.monotonic()
+
+    async def _send_or_edit(self, text: str, parse_mode: Optional[str], reply_markup: Optional[InlineKeyboardMarkup]):
+        if self.message is None:
+            self.message = await self.bot.send_message(
+                self.chat_id,
+                text,
+                parse_mode=parse_mode,
+                reply_markup=reply_markup
+            )
+        else:
+            await self.bot.edit_message_text(
+                text=text,
+                chat_id=self.chat_id,
+                message_id=self.message.message_id,
+                parse_mode=parse_mode,
+                reply_markup=reply_markup
+            )
@@ -188,6 +188,16 @@ Endi siz botdan foydalanishingiz mumkin. Keling, investitsiya rejangizni tuzamiz
 Энди сиз ботдан фойдаланишингиз мумкин. Келинг, инвестиция режангизни тузамиз!"""
     },
     
+    "verification_in_progress": {
+        "latin": "⏳ Emailingiz hali tekshirilmoqda. Natija tayyor bo'lishi bilan xabar beraman.",
+        "cyrillic": "⏳ Эмаилингиз ҳали текширилмоқда. Натижа тайёр бўлиши билан хабар бераман."
+    },
+    
+    "verification_unavailable": {
+        "latin": "⚠️ Hozir Uznetix bazasini tekshirib bo'lmadi. Iltimos, emailingizni bir necha daqiqadan keyin qayta yuboring.",
+        "cyrillic": "⚠️ Ҳозир Uznetix базасини текшириб бўлмади. Илтимос, эмаилингизни бир неча дақиқадан кейин қайта юборинг."
+    },
+    
     "verification_failed": {
         "latin": """❌ Kechirasiz, sizni Uznetix mijozi sifatida topa olmadim.
 
@@ -258,6 +268,11 @@ Birinchi savol:""",
         "cyrillic": "❌ Сессия тугади. Илтимос, қайтадан бошланг."
     },
     
+    "error_ai_busy": {
+        "latin": "⏳ Hozir juda ko'p so'rovlar bor. Iltimos, bir necha daqiqadan keyin qaytadan urinib ko'ring.",
+        "cyrillic": "⏳ Ҳозир жуда кўп сўровлар бор. Илтимос, бир неча дақиқадан кейин қайтадан уриниб кўринг."
+    },
+    
     "error_recommendation": {
         "latin": "❌ Tavsiya tayyorlashda xatolik. Iltimos, qaytadan urinib ko'ring.",
         "cyrillic": "❌ Тавсия тайёрлашда хатолик. Илтимос, қайтадан уриниб кўринг."
@@ -359,6 +374,58 @@ Birinchi savol:""",
     "error_general": {
         "latin": "❌ Xatolik yuz berdi. Iltimos, qaytadan urinib ko'ring yoki /start buyrug'ini yuboring.",
         "cyrillic": "❌ Хатолик юз берди. Илтимос, қайтадан уриниб кўринг ёки /start буйруғини юборинг."
+    },
+    
+    "slot_ack": {
+        "latin": "Ajoyib, yozib oldim — {recorded}.",
+        "cyrillic": "Ажойиб, ёзиб олдим — {recorded}."
+    },
+    
+    "slot_profile_complete": {
+        "latin": "Endi sizning to'liq profilingiz tayyor. Keling, men sizga maxsus tavsiya tayyorlayman!",
+        "cyrillic": "Энди сизнинг тўлиқ профилингиз тайёр. Келинг, мен сизга махсус тавсия тайёрлайман!"
+    },
+    
+    "slot_label_goal": {"latin": "maqsad", "cyrillic": "мақсад"},
+    "slot_label_horizon": {"latin": "muddat", "cyrillic": "муддат"},
+    "slot_label_budget": {"latin": "byudjet", "cyrillic": "бюджет"},
+    "slot_label_risk_tolerance": {"latin": "risk", "cyrillic": "риск"},
+    "slot_label_liquidity": {"latin": "likvidlik", "cyrillic": "ликвидлик"},
+    "slot_label_currency": {"latin": "valyuta", "cyrillic": "валюта"},
+    "slot_label_experience": {"latin": "tajriba", "cyrillic": "тажриба"},
+    "slot_label_restrictions": {"latin": "cheklovlar", "cyrillic": "чекловлар"},
+    
+    "slot_question_goal": {
+        "latin": "Siz nima maqsadda investitsiya qilmoqchisiz? Uy sotib olish, ta'lim, pensiya yoki passiv daromadmi?",
+        "cyrillic": "Сиз нима мақсадда инвестиция қилмоқчисиз? Уй сотиб олиш, таълим, пенсия ёки пассив даромадми?"
+    },
+    "slot_question_horizon": {
+        "latin": "Bu maqsadga qancha vaqt ichida erishmoqchisiz? Necha yil yoki oy?",
+        "cyrillic": "Бу мақсадга қанча вақт ичида эришмоқчисиз? Неча йил ёки ой?"
+    },
+    "slot_question_budget": {
+        "latin": "Boshlang'ich qancha pul bor va oyiga qo'shimcha qancha ajrata olasiz?",
+        "cyrillic": "Бошланғич қанча пул бор ва ойига қўшимча қанча ажрата оласиз?"
+    },
+    "slot_question_risk_tolerance": {
+        "latin": "Risk darajangiz qanday — past, o'rta yoki yuqori? Bozor 20-30% tushsa, dosh berasizmi?",
+        "cyrillic": "Риск даражангиз қандай — паст, ўрта ёки юқори? Бозор 20-30% тушса, дош берасизми?"
+    },
+    "slot_question_liquidity": {
+        "latin": "Sizga likvidlik kerakmi? Ya'ni, bu pulni muddatidan oldin yechib olishingiz kerak bo'ladimi?",
+        "cyrillic": "Сизга ликвидлик керакми? Яъни, бу пулни муддатидан олдин ечиб олишингиз керак бўладими?"
+    },
+    "slot_question_currency": {
+        "latin": "Qaysi valyutada investitsiya qilmoqchisiz — dollar, so'm yoki boshqa?",
+        "cyrillic": "Қайси валютада инвестиция қилмоқчисиз — доллар, сўм ёки бошқа?"
+    },
+    "slot_question_experience": {
+        "latin": "Investitsiya tajribangiz qanday? Ilgari aksiya yoki ETF olganmisiz yoki bu birinchi marta?",
+        "cyrillic": "Инвестиция тажрибангиз қандай? Илгари акция ёки ETF олганмисиз ёки бу биринчи марта?"
+    },
+    "slot_question_restrictions": {
+        "latin": "Qandaydir cheklovlar bormi? Masalan, ba'zi sohalardan qochish yoki halol investitsiya kerakmi?",
+        "cyrillic": "Қандайдир чекловлар борми? Масалан, баъзи соҳалардан қочиш ёки ҳалол инвестиция керакми?"
     }
 
 }
@@ -1,5 +1,5 @@
 # database/engine.py
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Optional
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     AsyncEngine,
@@ -13,6 +13,54 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+class LazySession:
+    """
+    AsyncSession proxy that creates the session on first use.
+    
+    Handlers that never touch the database never open a session; see
+    release_connection() for giving the connection back mid-handler.
+    """
+    
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self._session_factory = session_factory
+        self._session: Optional[AsyncSession] = None
+    
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+    
+    def _get(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get(), name)
+    
+    async def finish(self, error: Optional[BaseException] = None):
+        if self._session is None:
+            return
+        try:
+            if error is None:
+                await self._session.commit()
+            else:
+                await self._session.rollback()
+        finally:
+            await self._session.close()
+            self._session = None
+
+
+async def release_connection(session: AsyncSession):
+    """
+    Commit the open transaction so its pooled connection is returned.
+    
+    Call before long external awaits (LLM, GetCourse); the session stays
+    usable and checks out a connection again on its next query.
+    """
+    if session.in_transaction():
+        await session.commit()
+
+
 class DatabaseEngine:
     
     def __init__(self):
@@ -63,6 +111,11 @@ class DatabaseEngine:
             await self.engine.dispose()
             logger.info("Database engine disposed")
     
+    def lazy_session(self) -> LazySession:
+        if not self.session_factory:
+            raise RuntimeError("Session factory not initialized")
+        return LazySession(self.session_factory)
+    
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         if not self.session_factory:
             raise RuntimeError("Session factory not initialized")
@@ -1,9 +1,10 @@
 # database/models.py
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import BigInteger, Column, String, DateTime, Boolean, Text, Integer, JSON, Float
+from sqlalchemy import BigInteger, Column, String, DateTime, Boolean, Text, Integer, JSON, Float, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 
 class Base(DeclarativeBase):
@@ -28,7 +29,7 @@ class User(Base):
     
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    last_activity: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_activity: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     total_interviews: Mapped[int] = mapped_column(Integer, default=0)
     completed_interviews: Mapped[int] = mapped_column(Integer, default=0)
@@ -51,15 +52,16 @@ class Recommendation(Base):
     
     recommendation_type: Mapped[str] = mapped_column(String(50)) 
     content: Mapped[str] = mapped_column(Text)
-    content_json: Mapped[dict] = mapped_column(JSON, default=dict)
+    content_json: Mapped[dict] = mapped_column(JSONB, default=dict)
     
-    stocks: Mapped[list] = mapped_column(JSON, default=list)
-    etfs: Mapped[list] = mapped_column(JSON, default=list)
-    bonds: Mapped[list] = mapped_column(JSON, default=list)
-    other: Mapped[list] = mapped_column(JSON, default=list)
+    stocks: Mapped[list] = mapped_column(JSONB, default=list)
+    etfs: Mapped[list] = mapped_column(JSONB, default=list)
+    bonds: Mapped[list] = mapped_column(JSONB, default=list)
+    other: Mapped[list] = mapped_column(JSONB, default=list)
     
     ai_model_used: Mapped[str] = mapped_column(String(100))
     generation_time: Mapped[float] = mapped_column(Float)
+    from_cache: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
     
     user_rating: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     user_feedback: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -92,16 +94,31 @@ class BotLog(Base):
 
 class InterviewSession(Base):
     __tablename__ = "interview_sessions"
+    __table_args__ = (
+        Index("ix_interview_sessions_telegram_id_created_at", "telegram_id", "created_at"),
+        # get_active_session only ever looks at active rows
+        Index(
+            "ix_interview_sessions_active",
+            "telegram_id",
+            "created_at",
+            postgresql_where=text("status = 'active'")
+        ),
+        # Containment queries on the profile, e.g. collected_data @> '{"currency": "USD"}'
+        Index(
+            "ix_interview_sessions_collected_data",
+            "collected_data",
+            postgresql_using="gin",
+            postgresql_ops={"collected_data": "jsonb_path_ops"}
+        ),
+    )
     
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     telegram_id: Mapped[int] = mapped_column(BigInteger, index=True)
     user_id: Mapped[int] = mapped_column(BigInteger, index=True)
     
-    status: Mapped[str] = mapped_column(String(50), default="active")  
+    status: Mapped[str] = mapped_column(String(50), default="active", index=True)
     
-    conversation_history: Mapped[list] = mapped_column(JSON, default=list)
-    
-    collected_data: Mapped[dict] = mapped_column(JSON, default=dict)
+    collected_data: Mapped[dict] = mapped_column(JSONB, default=dict)
     # Structure: {
     #   "goal": "...",
     #   "horizon": "...",
@@ -114,11 +131,57 @@ class InterviewSession(Base):
     #   "halal_filter": false
     # }
     
+    # Compact summary of turns that fell out of the LLM context window
+    history_summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    
     preferred_script: Mapped[str] = mapped_column(String(10), default="latin")
     questions_asked: Mapped[int] = mapped_column(Integer, default=0)
     
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    
+    def __repr__(self) -> str:
+        return f"<InterviewSession(id={self.id}, telegram_id={self.telegram_id}, status={self.status})>"
+
+
+class InterviewMessage(Base):
+    __tablename__ = "interview_messages"
+    __table_args__ = (
+        Index("ix_interview_messages_session_id_id", "session_id", "id"),
+    )
+    
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    session_id: Mapped[int] = mapped_column(BigInteger)
+    role: Mapped[str] = mapped_column(String(20))  # user, assistant
+    content: Mapped[str] = mapped_column(Text)
+    phase: Mapped[str] = mapped_column(String(20), default="interview")  # interview, advisor
+    
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self) -> str:
+        return f"<InterviewMessage(id={self.id}, session_id={self.session_id}, role={self.role})>"
+
+
+class VerificationJob(Base):
+    __tablename__ = "verification_jobs"
+    
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    telegram_id: Mapped[int] = mapped_column(BigInteger, index=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    email: Mapped[str] = mapped_column(String(255))
+    script: Mapped[str] = mapped_column(String(10), default="latin")
+    # Message shown while the check runs; removed when the result is sent
+    ack_message_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    
+    status: Mapped[str] = mapped_column(String(20), default="pending", index=True)  # pending, running, done, failed
+    is_verified: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    duration: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     
     def __repr__(self) -> str:
-        return f"<InterviewSession(id={self.id}, telegram_id={self.telegram_id}, status={self.status})>"
\ No newline at end of file
+        return f"<VerificationJob(id={self.id}, telegram_id={self.telegram_id}, status={self.status})>"
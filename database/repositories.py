@@ -1,14 +1,25 @@
 # database/repositories.py
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
-from sqlalchemy import select, update, delete, func, desc
+from sqlalchemy import select, insert, update, delete, func, desc, cast, values, column, or_, and_, BigInteger, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
-from database.models import User, InterviewSession, Recommendation, BotLog
+from database.models import User, InterviewSession, InterviewMessage, Recommendation, BotLog, VerificationJob
+from services.user_cache import UserSnapshot, user_cache, invalidate_user_after_commit
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _message_dict(msg: InterviewMessage) -> Dict[str, Any]:
+    return {
+        "role": msg.role,
+        "content": msg.content,
+        "phase": msg.phase,
+        "timestamp": msg.created_at.isoformat() if msg.created_at else None
+    }
+
+
 class UserRepository:
     
     @staticmethod
@@ -18,11 +29,26 @@ class UserRepository:
         )
         return result.scalar_one_or_none()
     
+    @staticmethod
+    async def get_snapshot(session: AsyncSession, telegram_id: int) -> Optional[UserSnapshot]:
+        """User fields needed by handlers, read through the user cache"""
+        cached = await user_cache.get(str(telegram_id))
+        if cached is not None:
+            return UserSnapshot(**cached)
+        
+        user = await UserRepository.get_by_telegram_id(session, telegram_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot.model_validate(user, from_attributes=True)
+        await user_cache.set(str(telegram_id), snapshot.model_dump())
+        return snapshot
+    
     @staticmethod
     async def create(session: AsyncSession, **kwargs) -> User:
         user = User(**kwargs)
         session.add(user)
         await session.flush()
+        invalidate_user_after_commit(session, user.telegram_id)
         return user
     
     @staticmethod
@@ -30,8 +56,18 @@ class UserRepository:
         await session.execute(
             update(User).where(User.telegram_id == telegram_id).values(**kwargs)
         )
+        invalidate_user_after_commit(session, telegram_id)
         return await UserRepository.get_by_telegram_id(session, telegram_id)
     
+    @staticmethod
+    async def increment(session: AsyncSession, telegram_id: int, **deltas: int):
+        """Atomically add to counter columns, e.g. increment(s, id, total_interviews=1)"""
+        await session.execute(
+            update(User)
+            .where(User.telegram_id == telegram_id)
+            .values({getattr(User, column): getattr(User, column) + delta for column, delta in deltas.items()})
+        )
+    
     @staticmethod
     async def update_activity(session: AsyncSession, telegram_id: int):
         await session.execute(
@@ -40,6 +76,25 @@ class UserRepository:
             .values(last_activity=func.now())
         )
     
+    @staticmethod
+    async def bulk_update_activity(session: AsyncSession, activity: Dict[int, datetime]) -> int:
+        """Set last_activity for many users in one UPDATE ... FROM (VALUES ...)"""
+        if not activity:
+            return 0
+        rows = values(
+            column("telegram_id", BigInteger),
+            column("seen_at", DateTime(timezone=True)),
+            name="activity"
+        ).data(list(activity.items()))
+        result = await session.execute(
+            update(User)
+            .where(User.telegram_id == rows.c.telegram_id)
+            .where(User.last_activity < rows.c.seen_at)
+            .values(last_activity=rows.c.seen_at)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
     @staticmethod
     async def get_all_users(session: AsyncSession, limit: int = 1000, offset: int = 0) -> List[User]:
         result = await session.execute(
@@ -51,6 +106,35 @@ class UserRepository:
     async def count_users(session: AsyncSession) -> int:
         result = await session.execute(select(func.count(User.id)))
         return result.scalar_one()
+    
+    @staticmethod
+    async def get_getcourse_emails(session: AsyncSession) -> Dict[str, bool]:
+        """Normalized getcourse_email -> whether any user with it is currently a client"""
+        email = func.lower(func.trim(User.getcourse_email))
+        result = await session.execute(
+            select(email, func.bool_or(User.is_getcourse_client))
+            .where(User.getcourse_email.is_not(None))
+            .group_by(email)
+        )
+        return {row[0]: bool(row[1]) for row in result.all()}
+    
+    @staticmethod
+    async def set_getcourse_status(session: AsyncSession, emails: List[str], is_client: bool) -> int:
+        """Update all users whose normalized getcourse_email is in emails"""
+        values = {"is_getcourse_client": is_client}
+        if is_client:
+            values["getcourse_verified_at"] = func.now()
+        result = await session.execute(
+            update(User)
+            .where(func.lower(func.trim(User.getcourse_email)).in_(emails))
+            .values(**values)
+            .returning(User.telegram_id)
+            .execution_options(synchronize_session=False)
+        )
+        telegram_ids = result.scalars().all()
+        for telegram_id in telegram_ids:
+            invalidate_user_after_commit(session, telegram_id)
+        return len(telegram_ids)
 
 
 
@@ -86,40 +170,109 @@ class InterviewSessionRepository:
         )
     
     @staticmethod
-    async def add_message(session: AsyncSession, session_id: int, role: str, content: str):
-        """Add message to conversation history"""
+    async def add_message(
+        session: AsyncSession,
+        session_id: int,
+        role: str,
+        content: str,
+        phase: str = "interview"
+    ):
+        """Append one message to the session's history"""
+        await InterviewSessionRepository.add_messages(session, session_id, [(role, content)], phase)
+    
+    @staticmethod
+    async def add_messages(
+        session: AsyncSession,
+        session_id: int,
+        messages: List[Tuple[str, str]],
+        phase: str = "interview"
+    ):
+        """Append (role, content) messages in one INSERT"""
+        if not messages:
+            return
+        await session.execute(
+            insert(InterviewMessage).values([
+                {"session_id": session_id, "role": role, "content": content, "phase": phase}
+                for role, content in messages
+            ])
+        )
+    
+    @staticmethod
+    async def get_messages(
+        session: AsyncSession,
+        session_id: int,
+        phase: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Session history, oldest first; with limit, only the latest messages"""
+        query = select(InterviewMessage).where(InterviewMessage.session_id == session_id)
+        if phase:
+            query = query.where(InterviewMessage.phase == phase)
+        query = query.order_by(desc(InterviewMessage.id))
+        if limit:
+            query = query.limit(limit)
+        result = await session.execute(query)
+        return [_message_dict(msg) for msg in reversed(result.scalars().all())]
+    
+    @staticmethod
+    async def get_messages_for_sessions(
+        session: AsyncSession,
+        session_ids: List[int]
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """History of several sessions in one query"""
+        history: Dict[int, List[Dict[str, Any]]] = {session_id: [] for session_id in session_ids}
+        if not session_ids:
+            return history
         result = await session.execute(
-            select(InterviewSession).where(InterviewSession.id == session_id)
+            select(InterviewMessage)
+            .where(InterviewMessage.session_id.in_(session_ids))
+            .order_by(InterviewMessage.session_id, InterviewMessage.id)
         )
-        interview = result.scalar_one_or_none()
-        if interview:
-            history = interview.conversation_history or []
-            history.append({
-                "role": role,
-                "content": content,
-                "timestamp": datetime.now().isoformat()
-            })
-            await session.execute(
-                update(InterviewSession)
-                .where(InterviewSession.id == session_id)
-                .values(conversation_history=history)
-            )
+        for msg in result.scalars().all():
+            history[msg.session_id].append(_message_dict(msg))
+        return history
     
     @staticmethod
     async def update_collected_data(session: AsyncSession, session_id: int, data_updates: dict):
-        """Update collected data"""
+        """Merge data_updates into collected_data in a single UPDATE"""
+        await session.execute(
+            update(InterviewSession)
+            .where(InterviewSession.id == session_id)
+            .values(
+                collected_data=func.coalesce(InterviewSession.collected_data, cast({}, JSONB))
+                .op("||", return_type=JSONB)(cast(data_updates, JSONB))
+            )
+        )
+    
+    @staticmethod
+    async def complete_with_recommendation(
+        session: AsyncSession,
+        session_id: int,
+        **recommendation_fields
+    ) -> Recommendation:
+        """
+        Mark the session completed, store its recommendation and bump the
+        user's completed_interviews. Nothing is committed here, so the caller
+        commits all three changes together.
+        """
         result = await session.execute(
-            select(InterviewSession).where(InterviewSession.id == session_id)
+            update(InterviewSession)
+            .where(InterviewSession.id == session_id)
+            .values(status="completed", completed_at=func.now())
+            .returning(InterviewSession.user_id, InterviewSession.telegram_id)
         )
-        interview = result.scalar_one_or_none()
-        if interview:
-            collected = interview.collected_data or {}
-            collected.update(data_updates)
-            await session.execute(
-                update(InterviewSession)
-                .where(InterviewSession.id == session_id)
-                .values(collected_data=collected)
-            )
+        user_id, telegram_id = result.one()
+        
+        recommendation = Recommendation(
+            session_id=session_id,
+            user_id=user_id,
+            telegram_id=telegram_id,
+            **recommendation_fields
+        )
+        session.add(recommendation)
+        await UserRepository.increment(session, telegram_id, completed_interviews=1)
+        await session.flush()
+        return recommendation
     
     @staticmethod
     async def get_by_id(session: AsyncSession, session_id: int) -> Optional[InterviewSession]:
@@ -182,4 +335,60 @@ class RecommendationRepository:
             .order_by(desc(Recommendation.created_at))
             .limit(limit)
         )
-        return list(result.scalars().all())
\ No newline at end of file
+        return list(result.scalars().all())
+
+
+class VerificationJobRepository:
+    
+    @staticmethod
+    async def create(session: AsyncSession, **kwargs) -> VerificationJob:
+        job = VerificationJob(**kwargs)
+        session.add(job)
+        await session.flush()
+        return job
+    
+    @staticmethod
+    async def get_by_id(session: AsyncSession, job_id: int) -> Optional[VerificationJob]:
+        result = await session.execute(
+            select(VerificationJob).where(VerificationJob.id == job_id)
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    def _claimable(stale_before: datetime):
+        """Pending jobs, or running jobs whose worker has not finished them in time"""
+        return or_(
+            VerificationJob.status == "pending",
+            and_(VerificationJob.status == "running", VerificationJob.started_at < stale_before)
+        )
+    
+    @staticmethod
+    async def get_unfinished(session: AsyncSession, stale_before: datetime) -> List[VerificationJob]:
+        """Jobs left pending or interrupted mid-run, oldest first"""
+        result = await session.execute(
+            select(VerificationJob)
+            .where(VerificationJobRepository._claimable(stale_before))
+            .order_by(VerificationJob.created_at)
+        )
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def claim(session: AsyncSession, job_id: int, stale_before: datetime) -> Optional[VerificationJob]:
+        """
+        Mark a job running in a single UPDATE ... RETURNING.
+        
+        Returns None when another worker or process already holds it.
+        """
+        result = await session.execute(
+            update(VerificationJob)
+            .where(VerificationJob.id == job_id, VerificationJobRepository._claimable(stale_before))
+            .values(status="running", started_at=func.now(), attempts=VerificationJob.attempts + 1)
+            .returning(VerificationJob)
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def update(session: AsyncSession, job_id: int, **kwargs):
+        await session.execute(
+            update(VerificationJob).where(VerificationJob.id == job_id).values(**kwargs)
+        )
@@ -0,0 +1,26 @@
+"""recommendation from_cache flag
+
+Revision ID: 3f8a2d61c7e9
+Revises: 9c1e5a7d2b40
+Create Date: 2026-10-17 11:40:05.562118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a2d61c7e9'
+down_revision: Union[str, None] = '9c1e5a7d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('recommendations', sa.Column('from_cache', sa.Boolean(), server_default='false', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('recommendations', 'from_cache')
@@ -0,0 +1,77 @@
+"""interview messages table
+
+Revision ID: 5d2f8e0b4a17
+Revises: b7e4c19a5d23
+Create Date: 2026-10-17 16:03:27.914502
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8e0b4a17'
+down_revision: Union[str, None] = 'b7e4c19a5d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('interview_messages',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('session_id', sa.BigInteger(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('phase', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_interview_messages_session_id_id', 'interview_messages', ['session_id', 'id'], unique=False)
+
+    # Backfill in original order so ids follow the JSON list positions
+    op.execute("""
+        INSERT INTO interview_messages (session_id, role, content, phase, created_at)
+        SELECT
+            s.id,
+            COALESCE(m.msg->>'role', 'user'),
+            COALESCE(m.msg->>'content', ''),
+            COALESCE(m.msg->>'phase', 'interview'),
+            COALESCE((m.msg->>'timestamp')::timestamptz, s.created_at)
+        FROM interview_sessions s
+        CROSS JOIN LATERAL json_array_elements(s.conversation_history) WITH ORDINALITY AS m(msg, position)
+        WHERE s.conversation_history IS NOT NULL
+          AND json_typeof(s.conversation_history) = 'array'
+        ORDER BY s.id, m.position
+    """)
+
+    op.drop_column('interview_sessions', 'conversation_history')
+
+
+def downgrade() -> None:
+    op.add_column('interview_sessions', sa.Column('conversation_history', sa.JSON(), nullable=True))
+    op.execute("""
+        UPDATE interview_sessions s
+        SET conversation_history = h.history
+        FROM (
+            SELECT
+                session_id,
+                json_agg(
+                    json_build_object(
+                        'role', role,
+                        'content', content,
+                        'phase', phase,
+                        'timestamp', to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+                    )
+                    ORDER BY id
+                ) AS history
+            FROM interview_messages
+            GROUP BY session_id
+        ) h
+        WHERE h.session_id = s.id
+    """)
+    op.execute("UPDATE interview_sessions SET conversation_history = '[]' WHERE conversation_history IS NULL")
+    op.alter_column('interview_sessions', 'conversation_history', nullable=False)
+    op.drop_index('ix_interview_messages_session_id_id', table_name='interview_messages')
+    op.drop_table('interview_messages')
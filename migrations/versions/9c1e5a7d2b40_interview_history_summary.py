@@ -0,0 +1,26 @@
+"""interview history summary
+
+Revision ID: 9c1e5a7d2b40
+Revises: 4705fd8337d0
+Create Date: 2026-10-17 09:12:40.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e5a7d2b40'
+down_revision: Union[str, None] = '4705fd8337d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('interview_sessions', sa.Column('history_summary', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('interview_sessions', 'history_summary')
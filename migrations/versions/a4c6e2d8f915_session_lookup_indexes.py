@@ -0,0 +1,37 @@
+"""session lookup indexes
+
+Revision ID: a4c6e2d8f915
+Revises: e1a9c4f7b362
+Create Date: 2026-10-17 18:10:36.725904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c6e2d8f915'
+down_revision: Union[str, None] = 'e1a9c4f7b362'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the tables writable while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index('ix_interview_sessions_telegram_id_created_at', 'interview_sessions', ['telegram_id', 'created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_interview_sessions_active', 'interview_sessions', ['telegram_id', 'created_at'], unique=False, postgresql_where=sa.text("status = 'active'"), postgresql_concurrently=True)
+        op.create_index(op.f('ix_interview_sessions_status'), 'interview_sessions', ['status'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_interview_sessions_completed_at'), 'interview_sessions', ['completed_at'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_users_last_activity'), 'users', ['last_activity'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_users_last_activity'), table_name='users', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_interview_sessions_completed_at'), table_name='interview_sessions', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_interview_sessions_status'), table_name='interview_sessions', postgresql_concurrently=True)
+        op.drop_index('ix_interview_sessions_active', table_name='interview_sessions', postgresql_concurrently=True)
+        op.drop_index('ix_interview_sessions_telegram_id_created_at', table_name='interview_sessions', postgresql_concurrently=True)
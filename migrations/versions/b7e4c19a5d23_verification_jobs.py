@@ -0,0 +1,46 @@
+"""verification jobs
+
+Revision ID: b7e4c19a5d23
+Revises: 3f8a2d61c7e9
+Create Date: 2026-10-17 14:12:48.208341
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4c19a5d23'
+down_revision: Union[str, None] = '3f8a2d61c7e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('verification_jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('telegram_id', sa.BigInteger(), nullable=False),
+    sa.Column('chat_id', sa.BigInteger(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('script', sa.String(length=10), nullable=False),
+    sa.Column('ack_message_id', sa.BigInteger(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('duration', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_verification_jobs_status'), 'verification_jobs', ['status'], unique=False)
+    op.create_index(op.f('ix_verification_jobs_telegram_id'), 'verification_jobs', ['telegram_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_verification_jobs_telegram_id'), table_name='verification_jobs')
+    op.drop_index(op.f('ix_verification_jobs_status'), table_name='verification_jobs')
+    op.drop_table('verification_jobs')
@@ -0,0 +1,58 @@
+"""jsonb columns
+
+Revision ID: e1a9c4f7b362
+Revises: 5d2f8e0b4a17
+Create Date: 2026-10-17 17:21:54.480173
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a9c4f7b362'
+down_revision: Union[str, None] = '5d2f8e0b4a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JSONB_COLUMNS = [
+    ('interview_sessions', 'collected_data'),
+    ('recommendations', 'content_json'),
+    ('recommendations', 'stocks'),
+    ('recommendations', 'etfs'),
+    ('recommendations', 'bonds'),
+    ('recommendations', 'other'),
+]
+
+
+def upgrade() -> None:
+    for table, column in JSONB_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=postgresql.JSONB(astext_type=sa.Text()),
+            existing_type=sa.JSON(),
+            postgresql_using=f'{column}::jsonb'
+        )
+    op.create_index(
+        'ix_interview_sessions_collected_data',
+        'interview_sessions',
+        ['collected_data'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'collected_data': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interview_sessions_collected_data', table_name='interview_sessions', postgresql_using='gin')
+    for table, column in JSONB_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(astext_type=sa.Text()),
+            postgresql_using=f'{column}::json'
+        )
@@ -0,0 +1,203 @@
+# scripts/bench_indexes.py
+"""
+Benchmark the hot session/recommendation queries with and without indexes.
+
+Run against a disposable database that has been migrated to head:
+
+    python -m scripts.bench_indexes --seed 50000
+    python -m scripts.bench_indexes --runs 200
+
+For every query it prints the plan's top scan node and the median
+execution time, first with the session lookup indexes and then with them
+dropped inside a transaction that is rolled back afterwards.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from config import settings
+
+# Synthetic rows use telegram ids from here up so they are easy to delete
+BENCH_TELEGRAM_ID = 9_000_000_000
+
+INDEXES = [
+    "ix_interview_sessions_telegram_id_created_at",
+    "ix_interview_sessions_active",
+    "ix_interview_sessions_status",
+    "ix_interview_sessions_completed_at",
+    "ix_users_last_activity",
+]
+
+QUERIES: List[Tuple[str, str]] = [
+    (
+        "get_active_session",
+        "SELECT * FROM interview_sessions WHERE telegram_id = :telegram_id AND status = 'active' "
+        "ORDER BY created_at DESC LIMIT 1",
+    ),
+    (
+        "get_user_sessions",
+        "SELECT * FROM interview_sessions WHERE telegram_id = :telegram_id "
+        "ORDER BY created_at DESC LIMIT 10",
+    ),
+    (
+        "recommendation_by_session",
+        "SELECT * FROM recommendations WHERE session_id = :session_id",
+    ),
+    (
+        "count_completed",
+        "SELECT count(id) FROM interview_sessions WHERE status = 'completed'",
+    ),
+    (
+        "completed_today",
+        "SELECT count(id) FROM interview_sessions WHERE status = 'completed' AND completed_at >= current_date",
+    ),
+    (
+        "active_users_7d",
+        "SELECT count(id) FROM users WHERE last_activity >= now() - interval '7 days'",
+    ),
+]
+
+SEED_SQL = [
+    """
+    INSERT INTO users (telegram_id, is_getcourse_client, preferred_script, total_interviews,
+                       completed_interviews, last_activity)
+    SELECT CAST(:base AS bigint) + g, g % 3 = 0, 'latin', 3, 2, now() - (g % 60) * interval '1 day'
+    FROM generate_series(1, :users) g
+    ON CONFLICT (telegram_id) DO NOTHING
+    """,
+    """
+    INSERT INTO interview_sessions (telegram_id, user_id, status, collected_data, preferred_script,
+                                    questions_asked, created_at, completed_at)
+    SELECT u.telegram_id, u.id,
+           CASE WHEN s = 3 THEN 'active' WHEN s = 2 THEN 'abandoned' ELSE 'completed' END,
+           jsonb_build_object('currency', CASE WHEN u.id % 2 = 0 THEN 'USD' ELSE 'UZS' END),
+           'latin', 8,
+           now() - (u.id % 90 + 3 - s) * interval '1 day',
+           CASE WHEN s = 1 THEN now() - (u.id % 90 + 2) * interval '1 day' END
+    FROM users u CROSS JOIN generate_series(1, 3) s
+    WHERE u.telegram_id > :base
+    """,
+    """
+    INSERT INTO recommendations (session_id, user_id, telegram_id, recommendation_type, content,
+                                 content_json, stocks, etfs, bonds, other, ai_model_used,
+                                 generation_time, from_cache)
+    SELECT s.id, s.user_id, s.telegram_id, 'portfolio', 'bench', '{}', '[]', '[]', '[]', '[]',
+           'bench', 1.0, false
+    FROM interview_sessions s
+    WHERE s.telegram_id > :base AND s.status = 'completed'
+    """,
+]
+
+
+async def seed(conn: AsyncConnection, users: int):
+    for statement in SEED_SQL:
+        await conn.execute(text(statement), {"base": BENCH_TELEGRAM_ID, "users": users})
+    await conn.execute(text("ANALYZE users"))
+    await conn.execute(text("ANALYZE interview_sessions"))
+    await conn.execute(text("ANALYZE recommendations"))
+    print(f"Seeded {users} users with 3 sessions each")
+
+
+async def clean(conn: AsyncConnection):
+    await conn.execute(
+        text("DELETE FROM recommendations WHERE telegram_id > :base"), {"base": BENCH_TELEGRAM_ID}
+    )
+    await conn.execute(
+        text("DELETE FROM interview_sessions WHERE telegram_id > :base"), {"base": BENCH_TELEGRAM_ID}
+    )
+    await conn.execute(text("DELETE FROM users WHERE telegram_id > :base"), {"base": BENCH_TELEGRAM_ID})
+    print("Removed benchmark rows")
+
+
+async def sample_params(conn: AsyncConnection) -> Dict[str, Any]:
+    row = (await conn.execute(text(
+        "SELECT telegram_id, id FROM interview_sessions WHERE status = 'completed' "
+        "ORDER BY id DESC LIMIT 1"
+    ))).first()
+    if row is None:
+        raise SystemExit("No completed sessions found, run with --seed first")
+    return {"telegram_id": row[0], "session_id": row[1]}
+
+
+def _scan_node(plan: Dict[str, Any]) -> str:
+    """First scan node in the plan, e.g. 'Index Scan using ix_... '"""
+    node = plan
+    while True:
+        node_type = node["Node Type"]
+        if "Scan" in node_type:
+            index = node.get("Index Name")
+            return f"{node_type} using {index}" if index else node_type
+        children = node.get("Plans") or []
+        if not children:
+            return node_type
+        node = children[0]
+
+
+async def measure(conn: AsyncConnection, params: Dict[str, Any], runs: int) -> Dict[str, Tuple[str, float]]:
+    results = {}
+    for name, sql in QUERIES:
+        query_params = {key: value for key, value in params.items() if f":{key}" in sql}
+        timings = []
+        scan = ""
+        for _ in range(runs):
+            raw = (await conn.execute(
+                text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"), query_params
+            )).scalar_one()
+            explain = raw if isinstance(raw, list) else json.loads(raw)
+            timings.append(explain[0]["Execution Time"])
+            scan = _scan_node(explain[0]["Plan"])
+        results[name] = (scan, statistics.median(timings))
+    return results
+
+
+def print_report(with_indexes: Dict[str, Tuple[str, float]], without_indexes: Dict[str, Tuple[str, float]]):
+    print(f"\n{'query':<28}{'without (ms)':>14}{'with (ms)':>12}{'speedup':>10}  plan with indexes")
+    print("-" * 110)
+    for name, _ in QUERIES:
+        scan_before, before = without_indexes[name]
+        scan_after, after = with_indexes[name]
+        speedup = before / after if after else 0.0
+        print(f"{name:<28}{before:>14.3f}{after:>12.3f}{speedup:>9.1f}x  {scan_after}")
+        print(f"{'':<28}{'':>36}  (was: {scan_before})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--seed", type=int, default=0, help="insert this many synthetic users first")
+    parser.add_argument("--clean", action="store_true", help="delete synthetic rows and exit")
+    parser.add_argument("--runs", type=int, default=50, help="executions per query")
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.database_url)
+    try:
+        async with engine.begin() as conn:
+            if args.clean:
+                await clean(conn)
+                return
+            if args.seed:
+                await seed(conn, args.seed)
+
+        async with engine.connect() as conn:
+            params = await sample_params(conn)
+            with_indexes = await measure(conn, params, args.runs)
+            await conn.rollback()
+
+            # DDL is transactional in PostgreSQL; the rollback restores the indexes
+            for index in INDEXES:
+                await conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+            without_indexes = await measure(conn, params, args.runs)
+            await conn.rollback()
+
+        print_report(with_indexes, without_indexes)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+# services/activity.py
+"""Write-behind tracking of users' last_activity"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from config import settings
+from database.engine import db
+from database.repositories import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """
+    Collects telegram_id -> last seen time in memory and writes them in one
+    bulk UPDATE every ACTIVITY_FLUSH_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self.pending: Dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, telegram_id: int):
+        self.pending[telegram_id] = datetime.now(timezone.utc)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.ACTIVITY_FLUSH_INTERVAL)
+            await self.flush()
+
+    async def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        flushed = False
+        try:
+            async with db.session_factory() as session:
+                updated = await UserRepository.bulk_update_activity(session, batch)
+                await session.commit()
+            flushed = True
+            logger.debug(f"Flushed activity for {len(batch)} users ({updated} rows updated)")
+        except Exception as e:
+            logger.error(f"Error flushing user activity: {e}")
+        finally:
+            if not flushed:
+                # Retry on the next flush, including the final one in stop() when
+                # this flush was cancelled; entries touched since then are newer
+                for telegram_id, seen_at in batch.items():
+                    self.pending.setdefault(telegram_id, seen_at)
+
+
+activity_tracker = ActivityTracker()
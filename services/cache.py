@@ -0,0 +1,227 @@
+# services/cache.py
+"""TTL caches backed by Redis, with an in-process LRU fallback"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis: Optional[Redis] = None
+
+
+def get_redis() -> Optional[Redis]:
+    """Shared Redis client, or None when REDIS_URL is not configured"""
+    global _redis
+    if not settings.REDIS_URL:
+        return None
+    if _redis is None:
+        _redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def close_redis():
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+        logger.info("Redis client closed")
+
+
+class LRUCache:
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheStore:
+    """
+    Namespaced JSON cache.
+
+    Values live in Redis when it is configured (eviction follows the server's
+    maxmemory-policy); otherwise, or when Redis errors, in a local LRU.
+    """
+
+    def __init__(self, namespace: str, ttl: int, maxsize: int = 1024):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = LRUCache(maxsize, ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = None
+        redis = get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(self._key(key))
+                value = json.loads(raw) if raw is not None else None
+            except RedisError as e:
+                logger.warning(f"Redis get failed for {self.namespace}, using local cache: {e}")
+                value = self.local.get(key)
+        else:
+            value = self.local.get(key)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = ttl if ttl is not None else self.ttl
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.set(self._key(key), json.dumps(value, ensure_ascii=False), ex=ttl)
+                return
+            except RedisError as e:
+                logger.warning(f"Redis set failed for {self.namespace}, using local cache: {e}")
+        self.local.set(key, value, ttl)
+
+    async def delete(self, key: str):
+        self.local.delete(key)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.delete(self._key(key))
+            except RedisError as e:
+                logger.warning(f"Redis delete failed for {self.namespace}: {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total * 100 if total else 0.0,
+        }
+
+
+class TwoTierCache(CacheStore):
+    """
+    Local LRU with a short TTL in front of Redis.
+
+    Deletes are published on a Redis channel; processes that called start()
+    drop their local copy when they receive one. Without the listener a
+    local entry may be stale for up to local_ttl seconds.
+    """
+
+    def __init__(self, namespace: str, ttl: int, local_ttl: float, maxsize: int = 1024):
+        super().__init__(namespace, ttl, maxsize)
+        self.local = LRUCache(maxsize, local_ttl)
+        self.local_hits = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def channel(self) -> str:
+        return f"cache:{self.namespace}:invalidate"
+
+    async def start(self):
+        """Subscribe to invalidations published by other processes"""
+        if get_redis() is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    async def _listen(self):
+        while True:
+            try:
+                async with get_redis().pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.local.delete(message["data"])
+            except RedisError as e:
+                logger.warning(f"Invalidation listener for {self.namespace} disconnected: {e}")
+                # Deletes may have been missed while disconnected
+                self.local.clear()
+                await asyncio.sleep(1)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            self.hits += 1
+            self.local_hits += 1
+            return value
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(self._key(key))
+                value = json.loads(raw) if raw is not None else None
+            except RedisError as e:
+                logger.warning(f"Redis get failed for {self.namespace}: {e}")
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self.local.set(key, value)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.set(self._key(key), json.dumps(value, ensure_ascii=False), ex=ttl or self.ttl)
+            except RedisError as e:
+                logger.warning(f"Redis set failed for {self.namespace}: {e}")
+
+    async def delete(self, key: str):
+        await super().delete(key)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.publish(self.channel, key)
+            except RedisError as e:
+                logger.warning(f"Redis publish failed for {self.namespace}: {e}")
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["local_hits"] = self.local_hits
+        stats["redis_hits"] = self.hits - self.local_hits
+        return stats
@@ -2,32 +2,92 @@
 import asyncio
 import aiohttp
 import logging
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, Set
+from urllib.parse import urlencode
 from config import settings
+from services.cache import CacheStore
+from services.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
+# GetCourse answers this while an export file is still being built
+EXPORT_NOT_READY_CODE = 909
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all callers of one API key.
+    
+    Tokens are reserved up front (the balance may go negative), so waiters
+    sleep in parallel without holding the lock.
+    """
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, max_wait: float) -> Optional[float]:
+        """Take a token, waiting at most max_wait seconds; returns the wait, or None if over budget"""
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if wait > max_wait:
+                return None
+            self.tokens -= 1
+        
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
 
 class GetCourseService:
     
     def __init__(self):
         self.api_base_url = settings.GETCOURSE_API_URL  
         self.api_key = settings.GETCOURSE_SECRET_KEY 
+        self.user_cache = CacheStore(
+            "getcourse_user",
+            settings.GETCOURSE_POSITIVE_TTL,
+            settings.GETCOURSE_CACHE_SIZE
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.limiter = TokenBucket(settings.GETCOURSE_RATE_PER_SECOND, settings.GETCOURSE_RATE_BURST)
+        self.calls_made = 0
+        self.calls_throttled = 0
+        self.calls_delayed = 0
+        self.wait_time = 0.0
     
     async def _make_request(self, url: str) -> Optional[Dict[str, Any]]:
+        waited = await self.limiter.acquire(settings.GETCOURSE_RATE_MAX_WAIT)
+        if waited is None:
+            self.calls_throttled += 1
+            logger.warning(f"GetCourse rate limit: request dropped after exceeding {settings.GETCOURSE_RATE_MAX_WAIT}s wait budget")
+            return None
+        if waited:
+            self.calls_delayed += 1
+            self.wait_time += waited
+        self.calls_made += 1
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        response_text = await response.text()
-                        logger.debug(f"GetCourse API response: {response_text}")
-                        return await response.json()
-                    else:
-                        logger.warning(f"GetCourse API returned status {response.status} for {url}")
-                        return None
+            session = http_clients.getcourse()
+            async with session.get(
+                url,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 200:
+                    response_text = await response.text()
+                    logger.debug(f"GetCourse API response: {response_text}")
+                    return await response.json()
+                else:
+                    logger.warning(f"GetCourse API returned status {response.status} for {url}")
+                    return None
         except aiohttp.ClientError as e:
             logger.error(f"GetCourse API request error: {e}")
             return None
@@ -35,6 +95,61 @@ class GetCourseService:
             logger.error(f"Unexpected error in GetCourse request: {e}")
             return None
     
+    def stats(self) -> dict:
+        return {
+            "calls_made": self.calls_made,
+            "calls_throttled": self.calls_throttled,
+            "calls_delayed": self.calls_delayed,
+            "wait_time": self.wait_time,
+            "avg_wait": self.wait_time / self.calls_delayed if self.calls_delayed else 0.0,
+        }
+    
+    def _is_export_pending(self, exports_data: Optional[Dict[str, Any]]) -> bool:
+        """True when GetCourse says the export exists but is not created yet"""
+        if not exports_data or exports_data.get("success"):
+            return False
+        
+        info = exports_data.get("info") or {}
+        error_code = exports_data.get("error_code") or info.get("error_code")
+        if str(error_code) == str(EXPORT_NOT_READY_CODE):
+            return True
+        
+        error_msg = str(exports_data.get("error_message") or info.get("error_message") or "").lower()
+        return "не создан" in error_msg or "not ready" in error_msg or "not created" in error_msg
+    
+    async def _wait_for_export(self, export_id: Any, deadline: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Poll an export until it is ready.
+        
+        Starts with a short interval and backs off up to GETCOURSE_POLL_MAX_INTERVAL.
+        Returns the export response (which may report "not found" or an error),
+        or None when it was still pending at GETCOURSE_POLL_DEADLINE.
+        """
+        exports_url = f"{self.api_base_url}/account/exports/{export_id}?key={self.api_key}"
+        deadline = time.monotonic() + (deadline or settings.GETCOURSE_POLL_DEADLINE)
+        interval = settings.GETCOURSE_POLL_INITIAL
+        attempts = 0
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Export {export_id} not ready after {attempts} polls")
+                return None
+            await asyncio.sleep(min(interval, remaining))
+            
+            attempts += 1
+            exports_data = await self._make_request(exports_url)
+            if exports_data and exports_data.get("success"):
+                logger.debug(f"Export {export_id} ready after {attempts} polls")
+                return exports_data
+            
+            if exports_data is not None and not self._is_export_pending(exports_data):
+                logger.warning(f"Export {export_id} failed: {exports_data.get('error_message', 'Unknown error')}")
+                return exports_data
+            
+            # Network errors are retried like a pending export until the deadline
+            interval = min(interval * settings.GETCOURSE_POLL_BACKOFF, settings.GETCOURSE_POLL_MAX_INTERVAL)
+    
     def _is_user_found_in_export(self, exports_data: Dict[str, Any]) -> bool:
         try:
             if not exports_data or not exports_data.get("success"):
@@ -83,7 +198,17 @@ class GetCourseService:
             logger.error(f"Error checking if user found in export: {e}")
             return False
     
-    async def verify_user(self, email: str) -> bool:
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        return email.strip().lower()
+    
+    async def _fetch_user_info(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        Run the users/exports flow for one email.
+        
+        Returns user info, {"registered": False} when the export says the user
+        does not exist, or None when the check could not be completed.
+        """
         try:
             users_url = f"{self.api_base_url}/account/users?key={self.api_key}&email={email}"
             users_data = await self._make_request(users_url)
@@ -92,70 +217,28 @@ class GetCourseService:
             
             if not users_data or not users_data.get("success"):
                 logger.warning(f"User check failed for {email}: {users_data.get('error_message', 'Unknown error') if users_data else 'No response'}")
-                return False
-            
-            export_id = users_data.get("info", {}).get("export_id")
-            if not export_id:
-                logger.warning(f"No export_id found for {email}")
-                return False
-            
-            await asyncio.sleep(5)
-            
-            exports_url = f"{self.api_base_url}/account/exports/{export_id}?key={self.api_key}"
-            logger.debug(f"Fetching exports from: {exports_url}")
-            
-            exports_data = await self._make_request(exports_url)
-            logger.debug(f"Exports API response for {email}: {exports_data}")
-            
-            if exports_data and exports_data.get("success"):
-                if self._is_user_found_in_export(exports_data):
-                    logger.info(f"✅ GetCourse verification successful for {email}")
-                    return True
-                else:
-                    logger.warning(f"❌ User {email} not found in export data (despite success=true)")
-                    return False
-            else:
-                error_msg = exports_data.get('error_message', 'Unknown error') if exports_data else 'No response'
-                logger.warning(f"❌ Export check failed for {email}: {error_msg}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"GetCourse verification error for {email}: {e}")
-            return False
-    
-    async def get_user_info(self, email: str) -> Optional[Dict[str, Any]]:
-        try:
-            users_url = f"{self.api_base_url}/account/users?key={self.api_key}&email={email}"
-            users_data = await self._make_request(users_url)
-            
-            if not users_data or not users_data.get("success"):
                 return None
             
             export_id = users_data.get("info", {}).get("export_id")
             if not export_id:
+                logger.warning(f"No export_id found for {email}")
                 return None
             
-            await asyncio.sleep(5)
-            
-            exports_url = f"{self.api_base_url}/account/exports/{export_id}?key={self.api_key}"
-            exports_data = await self._make_request(exports_url)
+            exports_data = await self._wait_for_export(export_id)
+            logger.debug(f"Exports API response for {email}: {exports_data}")
             
             if not exports_data or not exports_data.get("success"):
+                error_msg = exports_data.get('error_message', 'Unknown error') if exports_data else 'Export not ready before deadline'
+                logger.warning(f"❌ Export check failed for {email}: {error_msg}")
                 return None
             
             if not self._is_user_found_in_export(exports_data):
-                logger.debug(f"User {email} not found in GetCourse")
-                return None
+                logger.warning(f"❌ User {email} not found in export data (despite success=true)")
+                return {"email": email, "registered": False}
             
             info = exports_data.get("info", {})
             fields = info.get("fields", [])
-            items = info.get("items", [])
-            
-            if not items or len(items) == 0:
-                return None
-            
-            user_data_row = items[0]
-            
+            user_data_row = info.get("items", [])[0]
 
             user_info = {
                 "email": email,
@@ -170,13 +253,103 @@ class GetCourseService:
                         clean_field = field_name.strip().lower().replace(" ", "_")
                         user_info[clean_field] = value
             
-            logger.info(f"Retrieved user info for {email}: {list(user_info.keys())}")
+            logger.info(f"✅ Retrieved GetCourse user info for {email}: {list(user_info.keys())}")
             return user_info
             
         except Exception as e:
             logger.error(f"Error getting GetCourse user info for {email}: {e}")
             return None
     
+    async def _fetch_and_cache(self, email: str) -> Optional[Dict[str, Any]]:
+        user_info = await self._fetch_user_info(email)
+        if user_info is not None:
+            ttl = (
+                settings.GETCOURSE_POSITIVE_TTL if user_info.get("registered")
+                else settings.GETCOURSE_NEGATIVE_TTL
+            )
+            await self.user_cache.set(email, user_info, ttl=ttl)
+        return user_info
+    
+    async def lookup_user(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached GetCourse lookup by normalized email.
+        
+        Concurrent calls for the same email share one in-flight export.
+        Inconclusive checks (timeouts, API errors) are not cached.
+        """
+        email = self.normalize_email(email)
+        cached = await self.user_cache.get(email)
+        if cached is not None:
+            logger.debug(f"GetCourse cache hit for {email}")
+            return cached
+        
+        task = self._inflight.get(email)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_cache(email))
+            self._inflight[email] = task
+            task.add_done_callback(lambda _: self._inflight.pop(email, None))
+        else:
+            logger.debug(f"Joining in-flight GetCourse lookup for {email}")
+        
+        # Shield so one cancelled caller does not cancel the lookup for the others
+        return await asyncio.shield(task)
+    
+    async def invalidate_user(self, email: str):
+        await self.user_cache.delete(self.normalize_email(email))
+    
+    async def verify_user(self, email: str) -> bool:
+        user_info = await self.lookup_user(email)
+        return bool(user_info and user_info.get("registered"))
+    
+    async def get_user_info(self, email: str) -> Optional[Dict[str, Any]]:
+        user_info = await self.lookup_user(email)
+        if not user_info or not user_info.get("registered"):
+            return None
+        return user_info
+    
+    async def export_user_emails(self, filters: Dict[str, str]) -> Optional[Set[str]]:
+        """
+        Run one bulk users export and return the normalized emails in it.
+        
+        filters are GetCourse export filters, e.g. {"created_at[from]": "2024-01-01"}.
+        Returns None when the export could not be completed.
+        """
+        try:
+            query = urlencode({"key": self.api_key, **filters})
+            users_data = await self._make_request(f"{self.api_base_url}/account/users?{query}")
+            
+            if not users_data or not users_data.get("success"):
+                logger.warning(f"Bulk export request failed for {filters}: {users_data.get('error_message', 'Unknown error') if users_data else 'No response'}")
+                return None
+            
+            export_id = users_data.get("info", {}).get("export_id")
+            if not export_id:
+                logger.warning(f"No export_id in bulk export response for {filters}")
+                return None
+            
+            exports_data = await self._wait_for_export(export_id, deadline=settings.GETCOURSE_BULK_EXPORT_DEADLINE)
+            if not exports_data or not exports_data.get("success"):
+                return None
+            
+            info = exports_data.get("info", {})
+            fields = [str(field).strip().lower() for field in info.get("fields", [])]
+            if "email" not in fields:
+                logger.warning(f"Bulk export {export_id} has no email column")
+                return None
+            
+            email_index = fields.index("email")
+            emails = {
+                self.normalize_email(str(row[email_index]))
+                for row in info.get("items", [])
+                if len(row) > email_index and row[email_index]
+            }
+            logger.info(f"Bulk export {export_id} returned {len(emails)} emails")
+            return emails
+            
+        except Exception as e:
+            logger.error(f"Error running GetCourse bulk export for {filters}: {e}")
+            return None
+    
     async def check_user_access(self, email: str, course_id: Optional[str] = None) -> bool:
         try:
             user_info = await self.get_user_info(email)
@@ -0,0 +1,69 @@
+# services/http_clients.py
+"""Shared pooled HTTP clients for outbound APIs"""
+import importlib.util
+import logging
+from typing import Optional
+
+import aiohttp
+import httpx
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientRegistry:
+    """Application-wide HTTP clients, opened in on_startup and closed in on_shutdown"""
+
+    def __init__(self):
+        self._openai: Optional[httpx.AsyncClient] = None
+        self._getcourse: Optional[aiohttp.ClientSession] = None
+
+    async def startup(self):
+        self.openai()
+        self.getcourse()
+        logger.info("HTTP clients initialized")
+
+    def openai(self) -> httpx.AsyncClient:
+        """Client used by the OpenAI SDK (HTTP/2 when h2 is installed)"""
+        if self._openai is None or self._openai.is_closed:
+            http2 = settings.OPENAI_HTTP2 and importlib.util.find_spec("h2") is not None
+            if settings.OPENAI_HTTP2 and not http2:
+                logger.warning("h2 package not installed, OpenAI client falls back to HTTP/1.1")
+
+            self._openai = httpx.AsyncClient(
+                proxy=settings.OPENAI_PROXY_URL or None,
+                timeout=settings.OPENAI_TIMEOUT,
+                verify=False,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_POOL_SIZE,
+                    max_keepalive_connections=settings.OPENAI_POOL_SIZE,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_TIMEOUT
+                )
+            )
+        return self._openai
+
+    def getcourse(self) -> aiohttp.ClientSession:
+        """Session used for GetCourse API calls"""
+        if self._getcourse is None or self._getcourse.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.GETCOURSE_POOL_SIZE,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                use_dns_cache=True,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL
+            )
+            self._getcourse = aiohttp.ClientSession(connector=connector)
+        return self._getcourse
+
+    async def close(self):
+        if self._openai is not None:
+            await self._openai.aclose()
+            self._openai = None
+        if self._getcourse is not None:
+            await self._getcourse.close()
+            self._getcourse = None
+        logger.info("HTTP clients closed")
+
+
+http_clients = HttpClientRegistry()
@@ -0,0 +1,132 @@
+# services/interview_service.py
+"""Helpers for building bounded LLM context from interview history"""
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database.repositories import RecommendationRepository
+from services.cache import CacheStore
+
+PROFILE_FIELDS = [
+    "goal",
+    "horizon",
+    "budget",
+    "risk_tolerance",
+    "liquidity",
+    "currency",
+    "experience",
+    "restrictions",
+]
+
+PHASE_INTERVIEW = "interview"
+PHASE_ADVISOR = "advisor"
+
+# Recommendation text and profile for advisor chat, keyed by interview session id
+recommendation_context_cache = CacheStore(
+    "recommendation_context",
+    settings.SESSION_TIMEOUT,
+    settings.RECOMMENDATION_CACHE_SIZE
+)
+
+MAX_SUMMARY_ANSWERS = 8
+MAX_SUMMARY_ANSWER_CHARS = 150
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate; Uzbek text averages ~3 characters per token"""
+    return len(text) // 3 + 1
+
+
+def split_history(
+    history: List[Dict[str, Any]],
+    max_turns: int,
+    token_budget: int
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split history into (older, recent) messages.
+
+    Recent keeps at most max_turns user/assistant pairs and stays within
+    token_budget, always including at least the last message.
+    """
+    recent: List[Dict[str, Any]] = []
+    tokens = 0
+    for msg in reversed(history):
+        msg_tokens = estimate_tokens(msg.get("content", ""))
+        if recent and (len(recent) >= max_turns * 2 or tokens + msg_tokens > token_budget):
+            break
+        recent.append(msg)
+        tokens += msg_tokens
+
+    recent.reverse()
+    return history[:len(history) - len(recent)], recent
+
+
+def build_history_summary(
+    collected_data: Dict[str, Any],
+    older_messages: List[Dict[str, Any]]
+) -> Optional[str]:
+    """Compact summary of what the dropped turns established"""
+    if not older_messages:
+        return None
+
+    lines = []
+    known = [(field, collected_data[field]) for field in PROFILE_FIELDS if collected_data.get(field)]
+    if known:
+        lines.append("To'plangan ma'lumotlar:")
+        lines.extend(f"- {field}: {value}" for field, value in known)
+
+    answers = [msg["content"] for msg in older_messages if msg.get("role") == "user"]
+    if answers:
+        lines.append("Foydalanuvchining oldingi javoblari:")
+        for answer in answers[-MAX_SUMMARY_ANSWERS:]:
+            answer = " ".join(answer.split())
+            if len(answer) > MAX_SUMMARY_ANSWER_CHARS:
+                answer = answer[:MAX_SUMMARY_ANSWER_CHARS] + "..."
+            lines.append(f"- {answer}")
+
+    return "\n".join(lines) if lines else None
+
+
+def build_interview_context(
+    history: List[Dict[str, Any]],
+    collected_data: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return (recent messages sent verbatim, summary of older messages)"""
+    older, recent = split_history(
+        history,
+        settings.INTERVIEW_HISTORY_TURNS,
+        settings.INTERVIEW_CONTEXT_TOKENS
+    )
+    return recent, build_history_summary(collected_data, older)
+
+
+def build_advisor_context(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Recent advisor-chat turns that fit the advisor context budget"""
+    advisor_messages = [msg for msg in history if msg.get("phase") == PHASE_ADVISOR]
+    _, recent = split_history(
+        advisor_messages,
+        settings.ADVISOR_HISTORY_TURNS,
+        settings.ADVISOR_CONTEXT_TOKENS
+    )
+    return recent
+
+
+async def remember_recommendation_context(session_id: int, content: str, profile: Dict[str, Any]):
+    """Prime the advisor cache right after a recommendation is saved"""
+    await recommendation_context_cache.set(str(session_id), {"content": content, "profile": profile})
+
+
+async def get_recommendation_context(session: AsyncSession, session_id: int) -> Optional[Dict[str, Any]]:
+    """{"content", "profile"} of the session's recommendation, read through the cache"""
+    cached = await recommendation_context_cache.get(str(session_id))
+    if cached is not None:
+        return cached
+
+    recommendation = await RecommendationRepository.get_by_session_id(session, session_id)
+    if recommendation is None:
+        return None
+
+    context = {"content": recommendation.content, "profile": recommendation.content_json or {}}
+    await recommendation_context_cache.set(str(session_id), context)
+    return context
@@ -0,0 +1,154 @@
+# services/reverification.py
+"""Bulk re-verification of stored GetCourse emails from a few large exports"""
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from config import settings
+from database.engine import db
+from database.repositories import UserRepository
+from services.getcourse import getcourse_service
+from services.http_clients import http_clients
+
+logger = logging.getLogger(__name__)
+
+
+def export_windows(since: date, until: date, days: int) -> List[Dict[str, str]]:
+    """created_at filters that cover [since, until] in windows of the given length"""
+    windows = []
+    start = since
+    while start <= until:
+        end = min(start + timedelta(days=days - 1), until)
+        windows.append({
+            "created_at[from]": start.isoformat(),
+            "created_at[to]": end.isoformat(),
+        })
+        start = end + timedelta(days=1)
+    return windows
+
+
+async def fetch_getcourse_emails(windows: List[Dict[str, str]]) -> Optional[Set[str]]:
+    """All emails registered in GetCourse, or None if any export failed"""
+    emails: Set[str] = set()
+    for filters in windows:
+        window_emails = await getcourse_service.export_user_emails(filters)
+        if window_emails is None:
+            return None
+        emails |= window_emails
+    return emails
+
+
+async def confirm_missing(emails: List[str]) -> Tuple[List[str], int]:
+    """
+    Look up emails that are missing from the exports one by one.
+
+    The exports only cover accounts created since REVERIFY_SINCE. An email
+    that is missing from them is therefore not proof that the account is gone.
+    Returns (emails GetCourse reports as not registered, inconclusive count).
+    """
+    semaphore = asyncio.Semaphore(settings.REVERIFY_CONFIRM_CONCURRENCY)
+
+    async def check(email: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            # A cached positive lookup is exactly what is being re-checked
+            await getcourse_service.invalidate_user(email)
+            return await getcourse_service.lookup_user(email)
+
+    results = await asyncio.gather(*(check(email) for email in emails))
+    missing = [email for email, info in zip(emails, results) if info is not None and not info.get("registered")]
+    inconclusive = sum(1 for info in results if info is None)
+    return missing, inconclusive
+
+
+async def reverify_all() -> Dict[str, Any]:
+    """
+    Re-check every stored getcourse_email against bulk exports.
+
+    Emails found in the exports are confirmed in bulk. Clients whose email
+    is not in them lose client status only after a direct lookup confirms
+    the account is gone, and only when every export succeeded.
+    """
+    start_time = time.monotonic()
+    async with db.session_factory() as session:
+        stored = await UserRepository.get_getcourse_emails(session)
+
+    since = datetime.strptime(settings.REVERIFY_SINCE, "%Y-%m-%d").date()
+    windows = export_windows(since, date.today(), settings.REVERIFY_WINDOW_DAYS)
+    export_start = time.monotonic()
+    registered = await fetch_getcourse_emails(windows)
+    export_time = time.monotonic() - export_start
+
+    report = {
+        "emails": len(stored),
+        "export_calls": len(windows),
+        "export_time": export_time,
+        "verified": 0,
+        "revoked": 0,
+        "unconfirmed": 0,
+        "users_updated": 0,
+        "success": registered is not None,
+    }
+    if registered is None:
+        logger.warning("Bulk re-verification aborted: a GetCourse export failed")
+        report["total_time"] = time.monotonic() - start_time
+        return report
+
+    verified = [email for email in stored if email in registered]
+    absent = [email for email, is_client in stored.items() if is_client and email not in registered]
+    revoked, unconfirmed = await confirm_missing(absent)
+    report["verified"] = len(verified)
+    report["revoked"] = len(revoked)
+    report["unconfirmed"] = unconfirmed
+
+    batch_size = settings.REVERIFY_BATCH_SIZE
+    async with db.session_factory() as session:
+        for emails, is_client in ((verified, True), (revoked, False)):
+            for i in range(0, len(emails), batch_size):
+                report["users_updated"] += await UserRepository.set_getcourse_status(
+                    session, emails[i:i + batch_size], is_client
+                )
+                await session.commit()
+
+    total_time = time.monotonic() - start_time
+    report["total_time"] = total_time
+    report["emails_per_second"] = len(stored) / total_time if total_time else 0.0
+    logger.info(f"Bulk re-verification finished: {report}")
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    if not report["success"]:
+        return (
+            "❌ Qayta tekshiruv to'xtatildi: GetCourse eksporti bajarilmadi.\n"
+            f"Emaillar: {report['emails']}, eksport vaqti: {report['export_time']:.1f}s"
+        )
+    return (
+        "✅ <b>Qayta tekshiruv yakunlandi</b>\n\n"
+        f"📧 Emaillar: {report['emails']}\n"
+        f"📤 GetCourse eksportlari: {report['export_calls']} ({report['export_time']:.1f}s)\n"
+        f"✅ Tasdiqlandi: {report['verified']}\n"
+        f"⛔️ Bekor qilindi: {report['revoked']}\n"
+        f"❔ Tasdiqlanmadi (o'zgarishsiz): {report['unconfirmed']}\n"
+        f"👥 Yangilangan foydalanuvchilar: {report['users_updated']}\n"
+        f"⏱ Umumiy vaqt: {report['total_time']:.1f}s ({report['emails_per_second']:.1f} email/s)"
+    )
+
+
+async def main():
+    db.init_engine()
+    try:
+        report = await reverify_all()
+        print(report)
+    finally:
+        await http_clients.close()
+        await db.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main())
@@ -0,0 +1,243 @@
+# services/slot_extractor.py
+"""Rule-based extraction of interview profile fields from simple answers"""
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from bot.utils.text_utils import get_text
+from services.interview_service import PROFILE_FIELDS
+
+APOSTROPHES = "ʻʼ’‘`"
+
+CURRENCY_KEYWORDS = {
+    "USD": ["$", "usd", "dollar", "доллар", "долл"],
+    "UZS": ["uzs", "so'm", "som", "sum", "сўм", "сум", "сом"],
+    "RUB": ["₽", "rub", "rubl", "рубл", "руб"],
+    "EUR": ["€", "eur", "euro", "yevro", "evro", "евро"],
+    "GBP": ["£", "gbp", "funt", "фунт"],
+    "CNY": ["cny", "yuan", "юан"],
+    "TRY": ["try", "lira", "лира"],
+    "KZT": ["kzt", "tenge", "тенге"],
+    "JPY": ["jpy", "yen", "иена", "йена"],
+    "AED": ["aed", "dirham", "дирҳам", "дирхам"],
+}
+
+RISK_KEYWORDS = {
+    "yuqori": ["yuqori", "baland", "maksimal", "agressiv", "high", "юқори", "баланд", "максимал", "агрессив", "высокий"],
+    "o'rta": ["o'rta", "orta", "medium", "moderate", "ўрта", "средний"],
+    "past": ["past", "kam", "kamroq", "minimal", "ehtiyotkor", "low", "паст", "кам", "камроқ", "минимал", "эҳтиёткор", "низкий"],
+}
+
+GOAL_KEYWORDS = {
+    "uy olish": ["uy ", "uy.", "kvartira", "уй ", "уй.", "квартира"],
+    "ta'lim": ["ta'lim", "talim", "o'qish", "таълим", "ўқиш"],
+    "pensiya": ["pensiya", "пенсия"],
+    "passiv daromad": ["passiv", "пассив"],
+}
+
+# Words that make up a "no restrictions" answer ("Yo'q", "hech qanday cheklov yo'q", "нет")
+NO_RESTRICTION_WORDS = {
+    "yo'q", "yoq", "yok", "no", "none", "hech", "qanday", "narsa", "cheklov", "cheklovlar", "yo'qligi",
+    "йўқ", "йук", "ҳеч", "қандай", "нарса", "чеклов", "чекловлар", "нет", "никаких", "ограничений",
+}
+
+HALAL_KEYWORDS = ["halol", "halal", "islom", "shariat", "ҳалол", "халол", "ислом", "шариат"]
+
+HORIZON_RE = re.compile(
+    r"(\d+(?:[.,]\d+)?)\s*(?:-|–)?\s*"
+    r"(yil|year|йил|год|лет|oy|month|ой|месяц)",
+    re.IGNORECASE
+)
+AMOUNT_RE = re.compile(
+    r"(?:[$€£₽]\s*\d[\d\s,.]*|\d[\d\s,.]*\s*(?:k\b|ming|mln|million|минг|млн|миллион)?\s*"
+    r"(?:[$€£₽]|usd|dollar|доллар|so'm|som|sum|сўм|сум|uzs|rubl|руб|eur|euro|евро))",
+    re.IGNORECASE
+)
+MONTHLY_RE = re.compile(r"oy(iga|lik)|har oy|ойига|ойлик|ҳар ой|в месяц|monthly", re.IGNORECASE)
+
+# Answers this short are taken as a direct answer to the current question
+SHORT_ANSWER_WORDS = 4
+
+
+def _normalize(text: str) -> str:
+    for char in APOSTROPHES:
+        text = text.replace(char, "'")
+    return " ".join(text.lower().split())
+
+
+def _contains_any(text: str, keywords: List[str]) -> bool:
+    padded = f" {text} "
+    for keyword in keywords:
+        # Short keywords must be whole words: "kam" is not "kamida", "sum" is not "summa"
+        if keyword.isalpha() and len(keyword) <= 4:
+            if re.search(rf"(?<!\w){re.escape(keyword)}(?!\w)", padded):
+                return True
+        elif keyword in padded:
+            return True
+    return False
+
+
+def _extract_currency(text: str) -> Optional[Tuple[str, float]]:
+    found = [code for code, keywords in CURRENCY_KEYWORDS.items() if _contains_any(text, keywords)]
+    if len(found) == 1:
+        return found[0], 0.95
+    return None
+
+
+def _extract_horizon(text: str) -> Optional[Tuple[str, float]]:
+    match = HORIZON_RE.search(text)
+    if not match:
+        return None
+    number, unit = match.group(1), match.group(2).lower()
+    if unit in ("oy", "month", "ой", "месяц"):
+        return f"{number} oy", 0.9
+    return f"{number} yil", 0.9
+
+
+def _extract_budget(text: str) -> Optional[Tuple[str, float]]:
+    amounts = [m.group(0).strip(" ,.") for m in AMOUNT_RE.finditer(text)]
+    amounts = [a for a in amounts if any(ch.isdigit() for ch in a)]
+    if not amounts:
+        return None
+    monthly = MONTHLY_RE.search(text)
+    if len(amounts) > 1 and monthly:
+        return f"{amounts[0]} + {amounts[1]} oylik", 0.85
+    # "1000 dollar, oyiga 100 dan": the monthly part has no currency, leave it to the LLM
+    if len(amounts) == 1 and not monthly:
+        return amounts[0], 0.85
+    return None
+
+
+def _extract_risk(text: str, direct: bool) -> Optional[Tuple[str, float]]:
+    """direct: the answer is a short reply to the risk question itself"""
+    found = [level for level, keywords in RISK_KEYWORDS.items() if _contains_any(text, keywords)]
+    if len(found) != 1:
+        return None
+    mentions_risk = "risk" in text or "риск" in text or "xavf" in text or "хавф" in text
+    # A bare "kam" may answer any question (experience, budget); trust it only for the risk question
+    return found[0], 0.9 if (mentions_risk or direct) else 0.5
+
+
+def _extract_goal(text: str, short: bool) -> Optional[Tuple[str, float]]:
+    found = [goal for goal, keywords in GOAL_KEYWORDS.items() if _contains_any(text, keywords)]
+    if len(found) != 1:
+        return None
+    return found[0], 0.8 if short else 0.6
+
+
+def extract_slots(
+    text: str,
+    min_confidence: float = 0.0,
+    asked_field: Optional[str] = None
+) -> Dict[str, Tuple[Any, float]]:
+    """
+    Extract profile fields from a user answer.
+
+    Args:
+        text: Raw user message (Latin or Cyrillic)
+        min_confidence: Drop matches below this confidence
+        asked_field: Profile field the answered question asked for, if known
+
+    Returns:
+        {field: (value, confidence)}
+    """
+    normalized = _normalize(text)
+    if not normalized:
+        return {}
+
+    short = len(normalized.split()) <= SHORT_ANSWER_WORDS
+    # A horizon number must not be read as a budget amount
+    budget_text = HORIZON_RE.sub(" ", normalized)
+
+    candidates = {
+        "horizon": _extract_horizon(normalized),
+        "budget": _extract_budget(budget_text),
+        "currency": _extract_currency(normalized),
+        "risk_tolerance": _extract_risk(
+            normalized,
+            # "Kam pul bor, 500$" is about the amount, not the risk level
+            short and asked_field == "risk_tolerance" and not any(ch.isdigit() for ch in normalized)
+        ),
+        "goal": _extract_goal(normalized, short),
+    }
+    slots = {
+        field: match for field, match in candidates.items()
+        if match and match[1] >= min_confidence
+    }
+
+    if _contains_any(normalized, HALAL_KEYWORDS):
+        slots["halal_filter"] = (True, 0.9)
+
+    return slots
+
+
+def normalize_risk(value: Any) -> str:
+    """Map a free-form risk answer to past / o'rta / yuqori when possible"""
+    text = _normalize(str(value or ""))
+    match = _extract_risk(text, direct=True)
+    return match[0] if match else text
+
+
+def has_restrictions(value: Any) -> bool:
+    """Whether a restrictions answer excludes anything, as opposed to "yo'q"-style answers"""
+    words = re.findall(r"[\w']+", _normalize(str(value or "")))
+    return any(word not in NO_RESTRICTION_WORDS for word in words)
+
+
+def horizon_years(value: Any) -> Optional[float]:
+    """Investment horizon in years, parsed from a free-form answer"""
+    match = HORIZON_RE.search(_normalize(str(value or "")))
+    if not match:
+        return None
+    number = float(match.group(1).replace(",", "."))
+    if match.group(2).lower() in ("oy", "month", "ой", "месяц"):
+        return number / 12
+    return number
+
+
+def missing_fields(collected_data: Dict[str, Any]) -> List[str]:
+    """Profile fields that are still unknown"""
+    return [field for field in PROFILE_FIELDS if not collected_data.get(field)]
+
+
+def unfilled_slots(
+    extracted: Dict[str, Tuple[Any, float]],
+    collected_data: Dict[str, Any]
+) -> Dict[str, Tuple[Any, float]]:
+    """
+    Extracted fields that are still unknown.
+
+    An answer to one question often mentions other fields in passing
+    ("Yo'q, 3 yilgacha pulni yechmayman"), so local matches never overwrite
+    values already collected.
+    """
+    return {field: match for field, match in extracted.items() if not collected_data.get(field)}
+
+
+def build_local_followup(
+    extracted: Dict[str, Tuple[Any, float]],
+    collected_data: Dict[str, Any],
+    script: str,
+    min_confidence: float
+) -> Optional[Tuple[str, bool]]:
+    """
+    Templated reply for an answer that was parsed with high confidence.
+
+    Returns (text, interview_complete), or None when the LLM should answer.
+    """
+    confident = {
+        field: value for field, (value, confidence) in extracted.items()
+        if field in PROFILE_FIELDS and confidence >= min_confidence
+    }
+    if not confident:
+        return None
+
+    recorded = ", ".join(
+        f"{get_text(f'slot_label_{field}', script)}: {value}" for field, value in confident.items()
+    )
+    acknowledgement = get_text("slot_ack", script, recorded=recorded)
+
+    remaining = missing_fields(collected_data)
+    if not remaining:
+        return f"{acknowledgement}\n\n{get_text('slot_profile_complete', script)}", True
+
+    return f"{acknowledgement}\n\n{get_text(f'slot_question_{remaining[0]}', script)}", False
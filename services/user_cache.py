@@ -0,0 +1,68 @@
+# services/user_cache.py
+"""Cached user snapshots for the message hot path"""
+import asyncio
+from typing import Iterable, Optional, Set
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config import settings
+from services.cache import TwoTierCache
+
+user_cache = TwoTierCache(
+    "user",
+    settings.USER_CACHE_TTL,
+    settings.USER_CACHE_LOCAL_TTL,
+    settings.USER_CACHE_SIZE
+)
+
+# session.info key holding telegram ids to drop from the cache once committed
+PENDING_INVALIDATIONS = "user_cache_invalidations"
+
+_background: Set[asyncio.Task] = set()
+
+
+class UserSnapshot(BaseModel):
+    """The User fields handlers read; anything that changes often stays out"""
+    id: int
+    telegram_id: int
+    username: Optional[str] = None
+    first_name: Optional[str] = None
+    is_getcourse_client: bool = False
+    getcourse_email: Optional[str] = None
+    preferred_script: str = "latin"
+
+
+async def invalidate_user(telegram_id: int):
+    await user_cache.delete(str(telegram_id))
+
+
+async def invalidate_users(telegram_ids: Iterable[int]):
+    for telegram_id in telegram_ids:
+        await invalidate_user(telegram_id)
+
+
+def invalidate_user_after_commit(session: AsyncSession, telegram_id: int):
+    """
+    Drop the cached snapshot once the session commits.
+
+    Invalidating before the commit lets a concurrent get_snapshot cache the
+    old row again for the full USER_CACHE_TTL.
+    """
+    session.info.setdefault(PENDING_INVALIDATIONS, set()).add(telegram_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    telegram_ids = session.info.pop(PENDING_INVALIDATIONS, None)
+    if telegram_ids:
+        task = asyncio.get_running_loop().create_task(invalidate_users(telegram_ids))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session):
+    session.info.pop(PENDING_INVALIDATIONS, None)
@@ -0,0 +1,185 @@
+# services/verification_queue.py
+"""Background GetCourse verification with bounded workers"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+
+from bot.keyboards.inline import get_main_menu_keyboard
+from bot.states import UserStates
+from bot.utils.text_utils import get_text
+from config import settings
+from database.engine import db
+from database.models import VerificationJob
+from database.repositories import UserRepository, VerificationJobRepository
+from services.getcourse import getcourse_service
+
+logger = logging.getLogger(__name__)
+
+
+class VerificationQueue:
+    """
+    Runs GetCourse checks outside of update handlers.
+
+    Jobs are stored in verification_jobs first, so anything still pending, or
+    running for longer than VERIFICATION_JOB_TIMEOUT, is picked up again on
+    the next start. Workers claim jobs atomically, so several processes can
+    resume the same backlog without running a job twice.
+    """
+
+    def __init__(self):
+        self.queue: "asyncio.Queue[int]" = asyncio.Queue()
+        self.workers: List[asyncio.Task] = []
+        self.bot: Optional[Bot] = None
+        self.storage: Optional[BaseStorage] = None
+
+    async def start(self, bot: Bot, storage: BaseStorage):
+        self.bot = bot
+        self.storage = storage
+
+        async with db.session_factory() as session:
+            unfinished = await VerificationJobRepository.get_unfinished(session, self._stale_before())
+        for job in unfinished:
+            self.queue.put_nowait(job.id)
+
+        self.workers = [
+            asyncio.create_task(self._worker(i))
+            for i in range(settings.VERIFICATION_WORKERS)
+        ]
+        logger.info(f"Verification queue started: {len(self.workers)} workers, {len(unfinished)} jobs resumed")
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        logger.info("Verification queue stopped")
+
+    def enqueue(self, job_id: int):
+        self.queue.put_nowait(job_id)
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Verification worker {index} failed on job {job_id}: {e}")
+            finally:
+                self.queue.task_done()
+
+    @staticmethod
+    def _stale_before() -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=settings.VERIFICATION_JOB_TIMEOUT)
+    
+    async def _process(self, job_id: int):
+        async with db.session_factory() as session:
+            # Atomic, so a job resumed by several processes runs only once
+            job = await VerificationJobRepository.claim(session, job_id, self._stale_before())
+            await session.commit()
+        if not job:
+            return
+
+        user_info: Optional[dict] = None
+        is_verified = False
+        recorded = False
+        try:
+            # No DB connection is held while GetCourse builds the export
+            start_time = time.monotonic()
+            user_info = await getcourse_service.lookup_user(job.email)
+            duration = time.monotonic() - start_time
+
+            is_verified = bool(user_info and user_info.get("registered"))
+            async with db.session_factory() as session:
+                if is_verified:
+                    await UserRepository.update(
+                        session,
+                        job.telegram_id,
+                        is_getcourse_client=True,
+                        getcourse_email=job.email,
+                        getcourse_verified_at=datetime.now(),
+                        preferred_script=job.script
+                    )
+                await VerificationJobRepository.update(
+                    session,
+                    job_id,
+                    status="done" if user_info is not None else "failed",
+                    is_verified=is_verified if user_info is not None else None,
+                    error=None if user_info is not None else "GetCourse check inconclusive",
+                    finished_at=datetime.now(),
+                    duration=duration
+                )
+                await session.commit()
+            recorded = True
+
+            logger.info(f"Verification job {job_id} for {job.email}: verified={is_verified} in {duration:.2f}s")
+            await self._notify(job, user_info, is_verified)
+        except Exception as e:
+            logger.error(f"Verification job {job_id} for {job.email} failed: {e}")
+            if not recorded:
+                # Otherwise the job stays "running" until VERIFICATION_JOB_TIMEOUT and a restart
+                await self._mark_failed(job_id, str(e))
+                user_info, is_verified = None, False
+            try:
+                await self._notify(job, user_info, is_verified)
+            except Exception as notify_error:
+                logger.error(f"Could not notify user about verification job {job_id}: {notify_error}")
+
+    async def _mark_failed(self, job_id: int, error: str):
+        try:
+            async with db.session_factory() as session:
+                await VerificationJobRepository.update(
+                    session,
+                    job_id,
+                    status="failed",
+                    error=error[:500],
+                    finished_at=datetime.now()
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Could not mark verification job {job_id} failed: {e}")
+
+    async def _notify(self, job: VerificationJob, user_info: Optional[dict], is_verified: bool):
+        script = job.script
+        if job.ack_message_id:
+            try:
+                await self.bot.delete_message(job.chat_id, job.ack_message_id)
+            except TelegramBadRequest:
+                pass
+
+        state = FSMContext(
+            storage=self.storage,
+            key=StorageKey(bot_id=self.bot.id, chat_id=job.chat_id, user_id=job.telegram_id)
+        )
+
+        if is_verified:
+            await self.bot.send_message(
+                job.chat_id,
+                get_text("verification_success_uznetix", script),
+                reply_markup=get_main_menu_keyboard(script),
+                parse_mode=None
+            )
+            await state.set_state(UserStates.main_menu)
+            await state.update_data(script=script)
+            return
+
+        if user_info is None:
+            text = get_text("verification_unavailable", script)
+        else:
+            fail_text = get_text("verification_failed", script)
+            verification_text = get_text("verification_prompt", script)
+            text = f"{fail_text}\n\n{verification_text}"
+
+        await self.bot.send_message(job.chat_id, text, parse_mode=None)
+        await state.set_state(UserStates.waiting_email)
+
+
+verification_queue = VerificationQueue()
@@ -0,0 +1,35 @@
+import pytest
+
+from services.ai_service import ai_service
+
+
+def test_null_collected_keeps_reply_text():
+    turn = ai_service._parse_interview_envelope('{"reply":"Salom! Qaysi valyuta?","collected":null,"complete":false}')
+    assert turn.reply == "Salom! Qaysi valyuta?"
+    assert turn.collected == {}
+    assert turn.complete is False
+
+
+def test_non_dict_collected_is_dropped():
+    turn = ai_service._parse_interview_envelope('{"reply":"Rahmat","collected":["USD"],"complete":false}')
+    assert turn.reply == "Rahmat"
+    assert turn.collected == {}
+
+
+def test_complete_envelope_defaults_halal_filter():
+    turn = ai_service._parse_interview_envelope(
+        '{"reply":"Tayyor","collected":{"currency":"USD","budget":""},"complete":true}'
+    )
+    assert turn.complete is True
+    assert turn.collected == {"currency": "USD", "halal_filter": False}
+
+
+def test_envelope_without_reply_is_never_shown():
+    with pytest.raises(ValueError):
+        ai_service._parse_interview_envelope('{"collected":{},"complete":false}')
+
+
+def test_plain_text_uses_marker_parsing():
+    turn = ai_service._parse_interview_envelope("Qancha muddatga?")
+    assert turn.reply == "Qancha muddatga?"
+    assert turn.complete is False
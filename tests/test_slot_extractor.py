@@ -0,0 +1,62 @@
+from services.slot_extractor import extract_slots, has_restrictions, unfilled_slots
+
+
+def values(text):
+    return {field: value for field, (value, _) in extract_slots(text).items()}
+
+
+def test_short_keyword_does_not_match_word_prefix():
+    slots = extract_slots("kamida 5 yil")
+    assert "risk_tolerance" not in slots
+    assert slots["horizon"][0] == "5 yil"
+
+
+def test_amount_answer_is_not_a_confident_risk_level():
+    slots = extract_slots("Kam pul bor, 500$")
+    assert slots.get("risk_tolerance", (None, 0.0))[1] < 0.9
+
+
+def test_direct_risk_answer():
+    assert extract_slots("kam", asked_field="risk_tolerance")["risk_tolerance"] == ("past", 0.9)
+    assert values("kamroq risk")["risk_tolerance"] == "past"
+
+
+def test_bare_keyword_answering_another_question_is_not_risk():
+    slots = extract_slots("kam", min_confidence=0.75, asked_field="experience")
+    assert "risk_tolerance" not in slots
+    assert "risk_tolerance" not in extract_slots("o'rta", min_confidence=0.75)
+
+
+def test_sum_keyword_does_not_match_summa():
+    slots = values("Boshlang'ich summa 1000 dollar")
+    assert slots["currency"] == "USD"
+    assert slots["budget"] == "1000 dollar"
+
+
+def test_budget_with_monthly_contribution_is_left_to_the_llm():
+    assert "budget" not in values("1000 dollarim bor, oyiga 100 dan")
+
+
+def test_budget_with_priced_monthly_contribution():
+    assert values("1000 dollar, oyiga 100 dollar")["budget"] == "1000 dollar + 100 dollar oylik"
+
+
+def test_unfilled_slots_keeps_collected_values():
+    collected = {"horizon": "5 yil", "currency": "USD"}
+    extracted = extract_slots("Yo'q, 3 yilgacha pulni yechmayman")
+    assert extracted["horizon"][0] == "3 yil"
+    assert "horizon" not in unfilled_slots(extracted, collected)
+
+
+def test_unfilled_slots_fills_missing_fields():
+    extracted = extract_slots("10 yil")
+    assert unfilled_slots(extracted, {"horizon": None, "budget": "500$"}) == {"horizon": ("10 yil", 0.9)}
+
+
+def test_has_restrictions():
+    assert not has_restrictions(None)
+    assert not has_restrictions("Yo'q")
+    assert not has_restrictions("hech qanday cheklov yo'q")
+    assert not has_restrictions("Нет")
+    assert has_restrictions("tamaki va alkogol kompaniyalari yo'q")
+    assert has_restrictions("faqat halol")
@@ -0,0 +1,73 @@
+import asyncio
+
+from services.ai_service import AIService
+
+PROFILE = {
+    "goal": "uy olish",
+    "horizon": "5 yil",
+    "budget": "1000 dollar",
+    "risk_tolerance": "o'rta",
+    "liquidity": "yo'q",
+    "currency": "USD",
+    "experience": "yo'q",
+    "restrictions": "tamaki yo'q",
+}
+
+
+def make_service(result="tavsiya", delay=0.0):
+    service = AIService()
+    calls = []
+
+    async def generate(collected_data, script):
+        calls.append(collected_data)
+        await asyncio.sleep(delay)
+        return result
+
+    service._speculative_generate = generate
+    return service, calls
+
+
+def test_profile_key_ignores_key_order_and_spacing():
+    service = AIService()
+    reordered = dict(reversed(list(PROFILE.items())))
+    reordered["goal"] = "  Uy   olish "
+    assert service.recommendation_profile_key(PROFILE, "latin") == service.recommendation_profile_key(reordered, "latin")
+
+
+def test_profile_key_changes_with_restrictions():
+    service = AIService()
+    changed = dict(PROFILE, restrictions="alkogol yo'q")
+    assert service.recommendation_profile_key(PROFILE, "latin") != service.recommendation_profile_key(changed, "latin")
+
+
+def test_no_speculation_while_fields_are_missing():
+    async def run():
+        service, calls = make_service()
+        partial = {field: value for field, value in PROFILE.items() if field != "restrictions"}
+        service.maybe_prefetch_recommendation(1, partial, "latin")
+        await asyncio.sleep(0)
+        return calls, service._speculative
+
+    calls, speculative = asyncio.run(run())
+    assert calls == [] and speculative == {}
+
+
+def test_in_flight_matching_run_is_awaited():
+    async def run():
+        service, calls = make_service(delay=0.01)
+        service.maybe_prefetch_recommendation(1, PROFILE, "latin")
+        completed = dict(reversed(list(PROFILE.items())), halal_filter=False)
+        return await service.take_prefetched_recommendation(1, completed, "latin"), calls
+
+    text, calls = asyncio.run(run())
+    assert text == "tavsiya"
+    assert len(calls) == 1
+
+
+def test_changed_profile_drops_run():
+    async def run():
+        service, _ = make_service(delay=0.01)
+        service.maybe_prefetch_recommendation(1, PROFILE, "latin")
+        return await service.take_prefetched_recommendation(1, dict(PROFILE, budget="5000 dollar"), "latin")
+
+    assert asyncio.run(run()) is None